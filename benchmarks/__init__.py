@@ -0,0 +1 @@
+"""Benchmarks for the WLED Extended integration against a simulated WLED fleet."""
@@ -0,0 +1,213 @@
+"""Benchmark harness for WLED Extended against a simulated WLED fleet.
+
+The fake fleet (benchmarks/fake_wled.py) runs in a child process, so the CPU
+time measured here is the integration's own: the API client, the coordinator
+and the scheduler, driven on a bare HomeAssistant instance. Needs the
+homeassistant package installed. Run from the repository root:
+
+    python -m benchmarks.bench --devices 1 50 500
+    python -m benchmarks.bench --devices 50 --output baseline.json
+    python -m benchmarks.bench --devices 50 --baseline baseline.json
+
+Reported per fleet size:
+  startup_s                first refresh of every device, as at HA startup
+  memory_per_device_bytes  allocations per client + coordinator + first data
+  poll_cpu_ms_per_device   event-loop CPU per device per poll cycle
+  poll_cycle_wall_ms       wall time of one poll cycle over the whole fleet
+  command_p50_ms / p95     switch command round trip through the command queue
+  set_state_p50_ms         the raw POST behind it, without batching
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import frame
+
+from custom_components.wled_extension.api import WledExtendedApiClient
+from custom_components.wled_extension.coordinator import WledExtendedDataCoordinator
+from custom_components.wled_extension.manager import create_session
+from custom_components.wled_extension.scheduler import WledPollScheduler
+
+
+@asynccontextmanager
+async def fake_fleet(count: int, args: argparse.Namespace):
+    """Start a fake fleet in a child process and yield its hosts."""
+    command = [
+        sys.executable, "-m", "benchmarks.fake_wled",
+        "--devices", str(count),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--payload-padding", str(args.payload_padding),
+        "--failure-rate", str(args.failure_rate),
+        "--offline", str(min(args.offline, count)),
+        "--seed", "1",
+    ]
+    process = await asyncio.create_subprocess_exec(*command, stdout=subprocess.PIPE)
+    try:
+        hosts = [
+            (await process.stdout.readline()).decode().strip() for _ in range(count)
+        ]
+        yield hosts
+    finally:
+        process.terminate()
+        await process.wait()
+
+
+def _create_coordinators(hass, session, hosts) -> list[WledExtendedDataCoordinator]:
+    """Create a client and coordinator per host, as the integration's setup does."""
+    return [
+        WledExtendedDataCoordinator(hass, WledExtendedApiClient(host, session), host)
+        for host in hosts
+    ]
+
+
+async def _async_refresh_all(scheduler: WledPollScheduler, coordinators) -> None:
+    """Refresh every coordinator behind the scheduler's concurrency limit."""
+    await asyncio.gather(
+        *(scheduler.async_limited(coordinator.async_refresh()) for coordinator in coordinators)
+    )
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+async def async_bench_fleet(hass: HomeAssistant, hosts: list[str], args) -> dict:
+    """Run every measurement against one fleet."""
+    count = len(hosts)
+    result: dict[str, float | int] = {"devices": count}
+    scheduler = WledPollScheduler(hass, 10, args.max_concurrent)
+
+    # Memory: what a device costs once it has its first data
+    session = create_session(hass)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    coordinators = _create_coordinators(hass, session, hosts)
+    await _async_refresh_all(scheduler, coordinators)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    result["memory_per_device_bytes"] = round(allocated / count)
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    await session.close()
+
+    # Startup: fresh session, so connections are not warm yet
+    session = create_session(hass)
+    started = time.perf_counter()
+    coordinators = _create_coordinators(hass, session, hosts)
+    await _async_refresh_all(scheduler, coordinators)
+    result["startup_s"] = round(time.perf_counter() - started, 4)
+
+    # Poll cycles: CPU time of this process only, the fleet runs elsewhere
+    cpu_samples = []
+    wall_samples = []
+    for _ in range(args.cycles):
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        await _async_refresh_all(scheduler, coordinators)
+        wall_samples.append(time.perf_counter() - wall_started)
+        cpu_samples.append((time.process_time() - cpu_started) / count)
+    result["poll_cpu_ms_per_device"] = _ms(statistics.median(cpu_samples))
+    result["poll_cycle_wall_ms"] = _ms(statistics.median(wall_samples))
+
+    # Commands: round trip through the queue, and the raw request behind it
+    online = [c for c in coordinators if c.last_update_success][: args.command_devices]
+    command_samples = []
+    set_state_samples = []
+    for index in range(args.commands):
+        for coordinator in online:
+            started = time.perf_counter()
+            await coordinator.commands.async_set_audio_reactive(index % 2 == 0)
+            command_samples.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await coordinator.api_client.async_set_state({"AudioReactive": {"enabled": index % 2 == 0}})
+            set_state_samples.append(time.perf_counter() - started)
+    if command_samples:
+        command_samples.sort()
+        result["command_p50_ms"] = _ms(statistics.median(command_samples))
+        result["command_p95_ms"] = _ms(command_samples[int(len(command_samples) * 0.95) - 1])
+        result["set_state_p50_ms"] = _ms(statistics.median(set_state_samples))
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    await session.close()
+    scheduler.async_shutdown()
+    return result
+
+
+def _print_results(results: list[dict], baseline: dict[int, dict] | None) -> None:
+    """Print one block per fleet size, with deltas against a baseline if given."""
+    for result in results:
+        print(f"--- {result['devices']} devices")
+        reference = (baseline or {}).get(result["devices"], {})
+        for key, value in result.items():
+            if key == "devices":
+                continue
+            line = f"  {key:<26} {value}"
+            old = reference.get(key)
+            if isinstance(old, (int, float)) and old:
+                line += f"  ({(value - old) / old:+.1%} vs baseline {old})"
+            print(line)
+
+
+async def async_main(args: argparse.Namespace) -> list[dict]:
+    """Benchmark every requested fleet size."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        if hasattr(frame, "async_setup"):
+            frame.async_setup(hass)
+        results = []
+        try:
+            for count in args.devices:
+                async with fake_fleet(count, args) as hosts:
+                    results.append(await async_bench_fleet(hass, hosts, args))
+        finally:
+            await hass.async_stop(force=True)
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmarks and report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--commands", type=int, default=10)
+    parser.add_argument("--command-devices", type=int, default=5)
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--payload-padding", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--offline", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --output")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(async_main(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = {entry["devices"]: entry for entry in json.load(file)}
+    _print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""A fleet of fake WLED devices served by aiohttp.
+
+Each device listens on its own localhost port and serves the endpoints the
+integration uses: /json, /json/si, /json/state, /json/info, /json/cfg,
+/version, /settings/um and the /ws WebSocket. Latency, payload size, failure rate and
+offline devices are configurable.
+
+Run standalone to poke at it by hand:
+
+    python -m benchmarks.fake_wled --devices 3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import WSMsgType, web
+
+SYNC_MODE_NAMES = {0: "off", 1: "send mode", 2: "receive mode"}
+
+
+@dataclass
+class FakeWledOptions:
+    """How the simulated devices behave."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Extra bytes of effect names added to the full /json document
+    payload_padding: int = 0
+    # Share of HTTP requests answered with a 500 error
+    failure_rate: float = 0.0
+    # Number of devices whose port refuses connections
+    offline: int = 0
+    version: str = "0.15.0"
+    seed: int | None = None
+
+
+@dataclass
+class FakeWled:
+    """One simulated WLED device."""
+
+    name: str
+    options: FakeWledOptions
+    rng: random.Random
+    started: float = field(default_factory=time.monotonic)
+    ar_enabled: bool = False
+    sync_mode: int = 0
+    requests: int = 0
+    sockets: set[web.WebSocketResponse] = field(default_factory=set)
+
+    def state(self) -> dict:
+        """Return the device state document."""
+        return {
+            "on": True,
+            "bri": 128,
+            "transition": 7,
+            "ps": -1,
+            "seg": [{"id": 0, "start": 0, "stop": 60, "fx": 0, "sx": 128, "ix": 128, "pal": 0}],
+            "AudioReactive": {"on": self.ar_enabled},
+        }
+
+    def info(self) -> dict:
+        """Return the device info document. Uptime and heap change every second."""
+        uptime = int(time.monotonic() - self.started)
+        return {
+            "ver": self.options.version,
+            "vid": 2412100,
+            "name": self.name,
+            "mac": "aabbcc" + format(abs(hash(self.name)) % 0xFFFFFF, "06x"),
+            "leds": {"count": 60, "fps": 42 + uptime % 3, "pwr": 0},
+            "wifi": {"rssi": -55 - uptime % 5, "signal": 90, "channel": 6},
+            "freeheap": 150000 - uptime % 64,
+            "uptime": uptime,
+            "u": {"UDP Sound Sync": [SYNC_MODE_NAMES[self.sync_mode]]},
+        }
+
+    def cfg(self) -> dict:
+        """Return the configuration document."""
+        return {
+            "um": {
+                "AudioReactive": {
+                    "enabled": self.ar_enabled,
+                    "config": {"squelch": 10, "gain": 60, "AGC": 1},
+                    "sync": {"port": 11988, "mode": self.sync_mode},
+                }
+            }
+        }
+
+    def full(self) -> dict:
+        """Return the full /json document, effect and palette lists included."""
+        effects = ["Solid", "Blink", "Breathe", "Wipe", "Fade"] * 30
+        if self.options.payload_padding:
+            effects.append("x" * self.options.payload_padding)
+        return {
+            "state": self.state(),
+            "info": self.info(),
+            "effects": effects,
+            "palettes": ["Default", "Random Cycle", "Rainbow"] * 25,
+        }
+
+    async def _async_behave(self) -> None:
+        """Apply latency, and fail some requests."""
+        self.requests += 1
+        delay = self.options.latency + self.rng.uniform(0, self.options.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rng.random() < self.options.failure_rate:
+            raise web.HTTPInternalServerError()
+
+    async def _async_broadcast(self) -> None:
+        """Push state and info to every connected WebSocket."""
+        message = json.dumps({"state": self.state(), "info": self.info()})
+        for ws in list(self.sockets):
+            await ws.send_str(message)
+
+    async def handle_json(self, request: web.Request) -> web.Response:
+        """Serve GET /json and its sub-documents."""
+        await self._async_behave()
+        part = request.match_info.get("part", "")
+        documents = {
+            "": self.full,
+            "si": lambda: {"state": self.state(), "info": self.info()},
+            "state": self.state,
+            "info": self.info,
+            "cfg": self.cfg,
+        }
+        if part not in documents:
+            raise web.HTTPNotFound()
+        return web.json_response(documents[part]())
+
+    async def handle_version(self, request: web.Request) -> web.Response:
+        """Serve GET /version, the plain-text firmware version used as ping."""
+        await self._async_behave()
+        return web.Response(text=self.options.version)
+
+    async def handle_post_state(self, request: web.Request) -> web.Response:
+        """Serve POST /json/state."""
+        await self._async_behave()
+        payload = await request.json()
+        audio_reactive = payload.get("AudioReactive") or {}
+        if "enabled" in audio_reactive:
+            self.ar_enabled = bool(audio_reactive["enabled"])
+        await self._async_broadcast()
+        if payload.get("v"):
+            return web.json_response(self.state())
+        return web.json_response({"success": True})
+
+    async def handle_post_cfg(self, request: web.Request) -> web.Response:
+        """Serve POST /json/cfg."""
+        await self._async_behave()
+        payload = await request.json()
+        audio_reactive = (payload.get("um") or {}).get("AudioReactive") or {}
+        if "enabled" in audio_reactive:
+            self.ar_enabled = bool(audio_reactive["enabled"])
+        if "mode" in (audio_reactive.get("sync") or {}):
+            self.sync_mode = int(audio_reactive["sync"]["mode"])
+        if audio_reactive:
+            await self._async_broadcast()
+        return web.json_response({"success": True})
+
+    async def handle_settings_um(self, request: web.Request) -> web.Response:
+        """Serve the POST /settings/um form."""
+        await self._async_behave()
+        form = await request.post()
+        if "AudioReactive:sync:mode" in form:
+            self.sync_mode = int(form["AudioReactive:sync:mode"])
+            await self._async_broadcast()
+        return web.Response(text="<html>Usermod settings saved</html>", content_type="text/html")
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve the /ws WebSocket."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        try:
+            await ws.send_str(json.dumps({"state": self.state(), "info": self.info()}))
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    def app(self) -> web.Application:
+        """Build the aiohttp application of this device."""
+        app = web.Application()
+        app.router.add_get("/json", self.handle_json)
+        app.router.add_get("/json/{part}", self.handle_json)
+        app.router.add_get("/version", self.handle_version)
+        app.router.add_post("/json/state", self.handle_post_state)
+        app.router.add_post("/json/cfg", self.handle_post_cfg)
+        app.router.add_post("/settings/um", self.handle_settings_um)
+        app.router.add_get("/ws", self.handle_ws)
+        return app
+
+
+def _unused_port() -> int:
+    """Return a localhost port nothing listens on (used for offline devices)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeWledFleet:
+    """Starts N fake devices; use as an async context manager."""
+
+    def __init__(self, count: int, options: FakeWledOptions | None = None):
+        """Initialize the fleet."""
+        self.options = options or FakeWledOptions()
+        self.count = count
+        self.devices: list[FakeWled] = []
+        self.hosts: list[str] = []
+        self._runners: list[web.AppRunner] = []
+
+    async def __aenter__(self) -> FakeWledFleet:
+        """Start every device."""
+        rng = random.Random(self.options.seed)
+        for index in range(self.count):
+            if index < self.options.offline:
+                self.hosts.append(f"127.0.0.1:{_unused_port()}")
+                continue
+            device = FakeWled(f"wled-{index}", self.options, random.Random(rng.random()))
+            runner = web.AppRunner(device.app(), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            self.devices.append(device)
+            self._runners.append(runner)
+            self.hosts.append(f"127.0.0.1:{port}")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop every device."""
+        for runner in self._runners:
+            await runner.cleanup()
+
+    @property
+    def requests(self) -> int:
+        """Return the number of HTTP requests served so far."""
+        return sum(device.requests for device in self.devices)
+
+
+async def _async_serve(count: int, options: FakeWledOptions) -> None:
+    """Run a fleet until interrupted, printing its hosts."""
+    async with FakeWledFleet(count, options) as fleet:
+        for host in fleet.hosts:
+            print(host, flush=True)
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    """Serve a fake fleet from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--payload-padding", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--offline", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    options = FakeWledOptions(
+        latency=args.latency,
+        jitter=args.jitter,
+        payload_padding=args.payload_padding,
+        failure_rate=args.failure_rate,
+        offline=args.offline,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_async_serve(args.devices, options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
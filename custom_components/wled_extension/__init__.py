@@ -1,14 +1,46 @@
+import asyncio
 import logging
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, Event
-from homeassistant.const import CONF_HOST, Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.helpers.update_coordinator import UpdateFailed
-
-from .const import DOMAIN
+import time
+from functools import partial
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    ConfigEntry,
+    ConfigEntryChange,
+    ConfigEntryState,
+)
+from homeassistant.core import HomeAssistant, Event, callback
+from homeassistant.const import CONF_HOST, CONF_SCAN_INTERVAL, Platform
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    CAPABILITIES_TTL,
+    CONF_AUDIO_SYNC_INTERVAL,
+    CONF_AUDIO_SYNC_MONITOR,
+    CONF_FAST_START,
+    CONF_INTERVAL_OVERRIDES,
+    CONF_MAX_CONCURRENT,
+    CONF_PIGGYBACK,
+    DEFAULT_AUDIO_SYNC_INTERVAL,
+    DEFAULT_AUDIO_SYNC_MONITOR,
+    DEFAULT_FAST_START,
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_PIGGYBACK,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    SIGNAL_NEW_DEVICES,
+    SIGNAL_REMOVE_DEVICE,
+    WLED_DOMAIN,
+)
 from .api import WledExtendedApiClient
+from .audio_sync import WledAudioSyncMonitor
+from .capabilities import WledCapabilityStore
 from .coordinator import WledExtendedDataCoordinator
+from .manager import WledCoordinatorManager, create_session
+from .planner import WledSyncPlanner
+from .scheduler import WledPollScheduler, parse_interval_overrides
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,52 +48,173 @@ _LOGGER = logging.getLogger(__name__)
 EVENT_CONFIG_ENTRY_CREATED = "config_entry_created"
 EVENT_CONFIG_ENTRY_REMOVED = "config_entry_removed"
 
-# --- THIS IS THE CHANGE ---
-# We now load both 'select' and 'switch'
-PLATFORMS: list[Platform] = [Platform.SELECT, Platform.SWITCH]
-# --- END OF CHANGE ---
+PLATFORMS: list[Platform] = [Platform.NUMBER, Platform.SELECT, Platform.SENSOR, Platform.SWITCH]
+
+
+def _async_get_core_coordinator(
+    hass: HomeAssistant, wled_entry: ConfigEntry
+) -> DataUpdateCoordinator | None:
+    """Return the core WLED integration's coordinator for a WLED entry, if loaded."""
+    coordinator = getattr(wled_entry, "runtime_data", None)
+    if coordinator is None:
+        # Older cores kept the coordinator in hass.data
+        coordinator = hass.data.get(WLED_DOMAIN, {}).get(wled_entry.entry_id)
+    if isinstance(coordinator, DataUpdateCoordinator):
+        return coordinator
+    return None
+
+
+def _async_core_firmware_version(hass: HomeAssistant, wled_entry: ConfigEntry) -> str | None:
+    """Return the firmware version the core WLED integration last saw, if any."""
+    core_coordinator = _async_get_core_coordinator(hass, wled_entry)
+    try:
+        return str(core_coordinator.data.info.version)
+    except AttributeError:
+        return None
+
+
+def _async_device_identifiers(
+    hass: HomeAssistant, wled_entry_id: str
+) -> set[tuple[str, str]] | None:
+    """Return the identifiers of the core WLED device of a WLED entry.
+
+    Uses the registry's per-config-entry index rather than scanning every device.
+    """
+    devices = dr.async_entries_for_config_entry(dr.async_get(hass), wled_entry_id)
+    return devices[0].identifiers if devices else None
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up WLED Extended from a config entry."""
     
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN]["coordinators"] = {}
+
+    previous_manager: WledCoordinatorManager | None = hass.data[DOMAIN].pop("manager", None)
+    if previous_manager:
+        # Left over from a failed unload; never keep two sets of pollers
+        await previous_manager.async_shutdown()
+    previous_planner: WledSyncPlanner | None = hass.data[DOMAIN].pop("planner", None)
+    if previous_planner:
+        previous_planner.async_stop()
+    previous_monitor: WledAudioSyncMonitor | None = hass.data[DOMAIN].pop("audio_sync", None)
+    if previous_monitor:
+        previous_monitor.async_stop()
+
+    capability_store = WledCapabilityStore(hass)
+    await capability_store.async_load()
+
+    scheduler = WledPollScheduler(
+        hass,
+        entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        entry.options.get(CONF_MAX_CONCURRENT, DEFAULT_MAX_CONCURRENT),
+        parse_interval_overrides(entry.options.get(CONF_INTERVAL_OVERRIDES, "")),
+    )
+    manager = WledCoordinatorManager(hass, scheduler, create_session(hass))
+    hass.data[DOMAIN]["manager"] = manager
+    hass.data[DOMAIN]["planner"] = WledSyncPlanner(hass, manager)
+    async_setup_services(hass)
+    fast_start = entry.options.get(CONF_FAST_START, DEFAULT_FAST_START)
+    piggyback = entry.options.get(CONF_PIGGYBACK, DEFAULT_PIGGYBACK)
+
+    if entry.options.get(CONF_AUDIO_SYNC_MONITOR, DEFAULT_AUDIO_SYNC_MONITOR):
+        monitor = WledAudioSyncMonitor(
+            hass, entry.options.get(CONF_AUDIO_SYNC_INTERVAL, DEFAULT_AUDIO_SYNC_INTERVAL)
+        )
+        if await monitor.async_start():
+            hass.data[DOMAIN]["audio_sync"] = monitor
     
-    async def async_setup_wled_device(wled_entry: ConfigEntry):
-        """Set up a coordinator and signal platform setup."""
-        if wled_entry.entry_id in hass.data[DOMAIN]["coordinators"]:
+    async def async_setup_wled_device(wled_entry: ConfigEntry) -> bool:
+        """Set up a coordinator. Returns True if the platforms should add entities."""
+        if manager.closed:
+            return False
+        if wled_entry.entry_id in manager:
             _LOGGER.debug("WLED device %s already set up", wled_entry.title)
-            return
+            return False
 
         host = wled_entry.data.get(CONF_HOST)
         if not host:
             _LOGGER.error("WLED entry %s has no host", wled_entry.title)
-            return
+            return False
+
+        # The core integration uses the MAC address as unique ID
+        mac = wled_entry.unique_id
+        capabilities = capability_store.async_get(mac) if mac else None
+        if capabilities and not capabilities.audio_reactive:
+            version = _async_core_firmware_version(hass, wled_entry)
+            if (
+                version is not None
+                and version == capabilities.version
+                and time.time() - capabilities.detected_at < CAPABILITIES_TTL
+            ):
+                _LOGGER.debug("Skipping %s, its firmware has no Audio Reactive usermod", host)
+                return False
+            # Unknown or updated firmware, or an old result: the usermod may
+            # be there now, so detect again
+            capabilities = None
 
         _LOGGER.debug("Setting up WLED Extended for: %s", wled_entry.title)
         
-        session = async_get_clientsession(hass)
-        api_client = WledExtendedApiClient(host, session)
+        api_client = WledExtendedApiClient(
+            host,
+            manager.session,
+            partial(capability_store.async_update, mac) if mac else None,
+        )
+        if capabilities:
+            # Known from a previous run: no detection request before the first poll
+            api_client.seed_capabilities(capabilities)
         coordinator = WledExtendedDataCoordinator(hass, api_client, host)
+        coordinator.device_name = wled_entry.title
+        coordinator.device_identifiers = _async_device_identifiers(hass, wled_entry.entry_id)
         
-        try:
-            await coordinator.async_config_entry_first_refresh()
-        except UpdateFailed as err:
-            _LOGGER.warning("Failed to fetch data from %s: %s. Entity will be 'Unknown'.", host, err)
-        except Exception as err:
-            _LOGGER.error("Unexpected error setting up %s: %s", host, err)
-            return
+        if fast_start:
+            # Entities start from their restored state, so don't wait for the device
+            manager.async_create_task(
+                wled_entry.entry_id,
+                scheduler.async_limited(coordinator.async_refresh()),
+                f"first refresh {host}",
+            )
+        else:
+            # Runs after our entry has loaded (also for devices added later), so
+            # failures must not raise: an offline device still gets entities
+            # and is then probed by the scheduler until it answers
+            await scheduler.async_limited(coordinator.async_refresh())
+            if not coordinator.last_update_success:
+                _LOGGER.warning("Failed to fetch data from %s. Entity will be 'Unknown'.", host)
+
+            if manager.closed or wled_entry.entry_id in manager:
+                # Unloaded or set up by someone else while we were refreshing
+                await coordinator.async_shutdown()
+                return False
             
-        hass.data[DOMAIN]["coordinators"][wled_entry.entry_id] = coordinator
-        
-        # Send a signal to *both* platforms
-        async_dispatcher_send(hass, f"{DOMAIN}_new_device", wled_entry.entry_id)
+        manager.async_add(wled_entry.entry_id, coordinator)
+
+        core_coordinator = None
+        if piggyback:
+            core_coordinator = _async_get_core_coordinator(hass, wled_entry)
+            if core_coordinator is None:
+                _LOGGER.debug("Core WLED coordinator for %s not loaded, polling instead", host)
+        coordinator.async_use_core(core_coordinator)
+        return True
+
+    async def async_setup_wled_devices(wled_entries: list[ConfigEntry]) -> None:
+        """Set up several devices, then signal the platforms once for all of them."""
+        results = await asyncio.gather(
+            *(async_setup_wled_device(wled_entry) for wled_entry in wled_entries)
+        )
+        new_entry_ids = [
+            wled_entry.entry_id
+            for wled_entry, is_new in zip(wled_entries, results)
+            if is_new
+        ]
+        if new_entry_ids:
+            # Send a signal to *all* platforms
+            async_dispatcher_send(hass, SIGNAL_NEW_DEVICES, new_entry_ids)
 
     async def async_unload_wled_device(wled_entry_id: str):
         """Unload a coordinator and signal platform removal."""
         _LOGGER.debug("Unloading WLED Extended for entry ID: %s", wled_entry_id)
-        hass.data[DOMAIN]["coordinators"].pop(wled_entry_id, None)
-        async_dispatcher_send(hass, f"{DOMAIN}_remove_device", wled_entry_id)
+        await manager.async_remove(wled_entry_id)
+        async_dispatcher_send(hass, SIGNAL_REMOVE_DEVICE, wled_entry_id)
 
     async def async_wled_entry_listener(event: Event):
         """Listen for WLED entries being added or removed."""
@@ -78,18 +231,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.debug("WLED entry created: %s", wled_entry_id)
             wled_entry = hass.config_entries.async_get_entry(wled_entry_id)
             if wled_entry:
-                hass.async_create_task(async_setup_wled_device(wled_entry))
+                hass.async_create_task(async_setup_wled_devices([wled_entry]))
         elif event.event_type == EVENT_CONFIG_ENTRY_REMOVED:
             _LOGGER.debug("WLED entry removed: %s", wled_entry_id)
             hass.async_create_task(async_unload_wled_device(wled_entry_id))
 
-    # This will now set up both SELECT and SWITCH platforms
+    @callback
+    def async_wled_entry_changed(change: ConfigEntryChange, wled_entry: ConfigEntry) -> None:
+        """Follow the core coordinator of a WLED entry across its reloads."""
+        if change is not ConfigEntryChange.UPDATED or wled_entry.domain != WLED_DOMAIN:
+            return
+        coordinator = manager.coordinators.get(wled_entry.entry_id)
+        if coordinator is None:
+            return
+        core_coordinator = None
+        if wled_entry.state is ConfigEntryState.LOADED:
+            core_coordinator = _async_get_core_coordinator(hass, wled_entry)
+        coordinator.async_use_core(core_coordinator)
+
+    # This will now set up all platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
     listeners = [
         hass.bus.async_listen(EVENT_CONFIG_ENTRY_CREATED, async_wled_entry_listener),
         hass.bus.async_listen(EVENT_CONFIG_ENTRY_REMOVED, async_wled_entry_listener),
     ]
+    if piggyback:
+        listeners.append(
+            async_dispatcher_connect(hass, SIGNAL_CONFIG_ENTRY_CHANGED, async_wled_entry_changed)
+        )
     
     async def _async_unload_listeners():
         """A coroutine function to remove listeners."""
@@ -97,18 +267,33 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             remove_listener()
 
     entry.async_on_unload(_async_unload_listeners)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     
     _LOGGER.info("Scanning for existing WLED devices...")
-    for wled_entry in hass.config_entries.async_entries(domain="wled"):
-        hass.async_create_task(async_setup_wled_device(wled_entry))
+    hass.async_create_task(
+        async_setup_wled_devices(hass.config_entries.async_entries(domain=WLED_DOMAIN))
+    )
 
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the integration when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop("coordinators", None)
+        async_unload_services(hass)
+        planner: WledSyncPlanner | None = hass.data[DOMAIN].pop("planner", None)
+        if planner:
+            planner.async_stop()
+        manager: WledCoordinatorManager | None = hass.data[DOMAIN].pop("manager", None)
+        if manager:
+            await manager.async_shutdown()
+        monitor: WledAudioSyncMonitor | None = hass.data[DOMAIN].pop("audio_sync", None)
+        if monitor:
+            monitor.async_stop()
         
     return unload_ok
\ No newline at end of file
@@ -1,52 +1,382 @@
+import asyncio
 import aiohttp
-import async_timeout
 import logging
+import re
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 
-from .const import USERMOD_POST_KEY
+try:
+    # Optional faster decoder, used when installed
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from .const import (
+    CONNECT_TIMEOUT,
+    CONNECTIONS_PER_HOST,
+    INFO_REFRESH_POLLS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    READ_TIMEOUT,
+    TOTAL_TIMEOUT,
+    USERMOD_POST_KEY,
+    WS_HEARTBEAT,
+)
+from . import profiling
+from .models import (
+    SYNC_MODE_INFO_KEY,
+    DeviceCapabilities,
+    WledAudioConfig,
+    WledAudioSnapshot,
+)
+from .performance import DevicePerformance
+from .stats import RequestStats
 
 _LOGGER = logging.getLogger(__name__)
 
 # Maps friendly HA names to the WLED API's numeric values
 MODE_TO_WLED_API = {"Off": 0, "Send": 1, "Receive": 2}
 
+# A short connect timeout keeps offline devices cheap; reads may take longer.
+# The total bounds the whole request, so a hung socket is given up on
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(
+    total=TOTAL_TIMEOUT, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+)
+
+# First firmware serving state and info together on /json/si
+SI_MIN_VERSION = (0, 10, 0)
+
+
+def parse_version(version: str | None) -> tuple[int, ...]:
+    """Turn a WLED version string such as '0.16.0-alpha' into a comparable tuple."""
+    match = re.match(r"(\d+)\.(\d+)\.(\d+)", version or "")
+    if not match:
+        return (0, 0, 0)
+    return tuple(int(part) for part in match.groups())
+
+
+class TokenBucket:
+    """Limits the request rate to a host, allowing short bursts."""
+
+    def __init__(self, rate: float, capacity: int):
+        """Initialize a full bucket."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be sent. Waiters are served in order."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
 class WledExtendedApiClient:
     """API client for WLED Audio Reactive (0.16.0-alpha firmware)."""
     
-    def __init__(self, host: str, session: aiohttp.ClientSession):
-        """Initialize the client."""
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession,
+        on_capabilities: Callable[[DeviceCapabilities], None] | None = None,
+    ):
+        """Initialize the client.
+
+        on_capabilities is called with the result of every capability detection.
+        """
         self._host = host
         self._session = session
+        self._on_capabilities = on_capabilities
         
-        self._get_url = f"http://{host}/json"
+        self._get_url_si = f"http://{host}/json/si"
+        self._get_url_state = f"http://{host}/json/state"
+        self._get_url_info = f"http://{host}/json/info"
+        self._get_url_cfg = f"http://{host}/json/cfg"
+        self._get_url_version = f"http://{host}/version"
+        self._post_url_cfg = f"http://{host}/json/cfg"
         self._post_url_state = f"http://{host}/json/state"
         self._post_url_settings = f"http://{host}/settings/um"
+        self._ws_url = f"ws://{host}/ws"
+
+        # Concurrent GETs of the same URL share one request, unless a write
+        # happened since the shared one started (bumps the write generation)
+        self._inflight: dict[tuple[str, int], asyncio.Future] = {}
+        self._write_generation = 0
+        self._bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        self._connections = asyncio.Semaphore(CONNECTIONS_PER_HOST)
+        self.stats = RequestStats()
+        self.performance = DevicePerformance()
+
+        # Chosen once by async_detect_capabilities() or seed_capabilities()
+        self._version: str | None = None
+        self._data_urls: tuple[str, ...] | None = None
+        self._audio_reactive: bool | None = None
+        self._detected_at = 0.0
+
+        # The last snapshot (polled, pushed or returned by a command), and a
+        # hash of the /json/state body it was last polled from
+        self._snapshot: WledAudioSnapshot | None = None
+        self._state_digest: int | None = None
+        self._polls_until_info = 0
+
+    @property
+    def host(self) -> str:
+        """Return the host of the device."""
+        return self._host
+
+    @property
+    def firmware_version(self) -> str | None:
+        """Return the firmware version seen during capability detection."""
+        return self._version
+
+    @property
+    def capabilities(self) -> DeviceCapabilities | None:
+        """Return the detected capabilities, or None until they are known."""
+        if self._data_urls is None:
+            return None
+        return DeviceCapabilities(
+            self._version,
+            self._data_urls == (self._get_url_si,),
+            bool(self._audio_reactive),
+            self._detected_at,
+        )
+
+    def seed_capabilities(self, capabilities: DeviceCapabilities) -> None:
+        """Use previously detected capabilities instead of detecting them.
+
+        If the device turns out to run another firmware version, they are
+        detected again on the next poll.
+        """
+        self._version = capabilities.version
+        self._audio_reactive = capabilities.audio_reactive
+        self._detected_at = capabilities.detected_at
+        if capabilities.uses_si:
+            self._data_urls = (self._get_url_si,)
+        else:
+            self._data_urls = (self._get_url_state, self._get_url_info)
+
+    async def async_detect_capabilities(self) -> None:
+        """Pick the cheapest endpoints this firmware can serve our fields from.
+
+        /json/si returns state and info without the effect and palette lists;
+        firmware older than that gets separate /json/state and /json/info calls.
+        """
+        info = await self._async_get_json(self._get_url_info)
+        self.performance.record(info)
+        self._version = info.get("ver")
+        if parse_version(self._version) >= SI_MIN_VERSION:
+            self._data_urls = (self._get_url_si,)
+        else:
+            self._data_urls = (self._get_url_state, self._get_url_info)
+        # The usermod lists itself in info, even while it is disabled
+        usermods = info.get("u")
+        self._audio_reactive = isinstance(usermods, dict) and (
+            "AudioReactive" in usermods or SYNC_MODE_INFO_KEY in usermods
+        )
+        self._detected_at = time.time()
+        _LOGGER.debug("WLED %s runs %s, fetching %s", self._host, self._version, self._data_urls)
+        if self._on_capabilities:
+            self._on_capabilities(self.capabilities)
+
+    async def async_get_data(self) -> WledAudioSnapshot:
+        """Get the Audio Reactive fields from the WLED device.
+
+        Most polls only fetch /json/state, and when its body is byte-for-byte
+        the previous one it is not decoded at all: the previous snapshot is
+        returned as is. Info, which changes on every poll because of uptime
+        and heap, is only fetched every INFO_REFRESH_POLLS polls.
+        """
+        if self._data_urls is None:
+            await self.async_detect_capabilities()
+
+        generation = self._write_generation
+        if self._snapshot is None or self._polls_until_info <= 0:
+            snapshot = await self._async_get_state_and_info()
+            if generation == self._write_generation:
+                # Otherwise info may predate a write; fetch it again next poll
+                self._polls_until_info = INFO_REFRESH_POLLS
+        else:
+            snapshot = await self._async_get_state_only()
+        self._polls_until_info -= 1
+        self._snapshot = snapshot
+
+        if snapshot.version is not None and snapshot.version != self._version:
+            # Firmware was updated, pick the endpoints again on the next poll
+            self._data_urls = None
+        return snapshot
+
+    def request_info(self) -> None:
+        """Fetch info with the next poll, e.g. after missing pushed changes."""
+        self._polls_until_info = 0
+
+    def _merge_snapshot(self, snapshot: WledAudioSnapshot) -> None:
+        """Fold a snapshot that did not come from polling into the cached one.
+
+        State-only polls build on the cached snapshot, so it must not fall
+        behind pushes and command responses.
+        """
+        if self._snapshot is None:
+            return
+        self._snapshot = self._snapshot.merged(snapshot)
+        # The cache no longer matches the last polled body
+        self._state_digest = None
+
+    async def _async_get_state_and_info(self) -> WledAudioSnapshot:
+        """Fetch state and info with the endpoints picked for this firmware."""
+        # The state part of the new snapshot no longer matches the stored hash
+        self._state_digest = None
+        if len(self._data_urls) == 1:
+            json_data = await self._async_get_json(self._data_urls[0])
+        else:
+            state = await self._async_get_json(self._get_url_state)
+            info = await self._async_get_json(self._get_url_info)
+            json_data = {"state": state, "info": info}
+        info = json_data.get("info")
+        self.performance.record(info if isinstance(info, dict) else {})
+        return WledAudioSnapshot.from_json(json_data)
+
+    async def _async_get_state_only(self) -> WledAudioSnapshot:
+        """Fetch /json/state, skipping the decode if nothing changed."""
+        body = await self._async_get(self._get_url_state)
+        digest = hash(body)
+        if digest == self._state_digest:
+            self.stats.unchanged += 1
+            return self._snapshot
+        self._state_digest = digest
+        state = WledAudioSnapshot.from_json({"state": self._decode(body)})
+        return self._snapshot.merged(state)
+
+    def _decode(self, body: bytes) -> dict:
+        """Decode a JSON object body, timing it.
 
-    async def async_get_data(self) -> dict:
-        """Get the full JSON data from the WLED device."""
-        _LOGGER.debug("Sending GET request to %s", self._get_url)
+        A malformed body or one that is not an object raises WledApiError,
+        so it counts as a failed request like any other.
+        """
+        started = time.perf_counter()
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.get(self._get_url)
-                
-                _LOGGER.debug("Received response status: %s", response.status)
-                response.raise_for_status() # Will raise error if status >= 400
-                
-                json_data = await response.json()
-                _LOGGER.debug("Successfully parsed JSON response")
-                return json_data
+            with profiling.stage(self._host, "decode"):
+                json_data = json_loads(body)
+        except ValueError as err:
+            # orjson's and json's decode errors are both ValueErrors
+            self.stats.record_error(err)
+            raise WledApiError(f"Invalid JSON from {self._host}: {err}") from err
+        self.stats.record_decode(time.perf_counter() - started)
+        if not isinstance(json_data, dict):
+            err = WledApiError(f"Unexpected JSON from {self._host}: {type(json_data).__name__}")
+            self.stats.record_error(err)
+            raise err
+        return json_data
+
+    async def _async_get_json(self, url: str) -> dict:
+        """GET and decode a JSON document."""
+        return self._decode(await self._async_get(url))
+
+    async def _async_get(self, url: str) -> bytes:
+        """GET a body, joining an identical request already in flight."""
+        key = (url, self._write_generation)
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._async_fetch(url))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda done: self._forget_inflight(key, done))
+        else:
+            _LOGGER.debug("Joining in-flight GET request to %s", url)
+        # A cancelled caller must not cancel the request for the others
+        return await asyncio.shield(inflight)
+
+    @asynccontextmanager
+    async def _async_connection(self) -> AsyncIterator[None]:
+        """Hold one of the few HTTP connections an ESP accepts at a time.
+
+        Waiting for a free one is bounded by TOTAL_TIMEOUT, so a hung request
+        can't stall the ones queued behind it forever.
+        """
+        async with asyncio.timeout(TOTAL_TIMEOUT):
+            await self._connections.acquire()
+        try:
+            yield
+        finally:
+            self._connections.release()
+
+    def async_cancel_requests(self) -> None:
+        """Cancel every GET request still in flight."""
+        for inflight in list(self._inflight.values()):
+            inflight.cancel()
+
+    def _forget_inflight(self, key: tuple[str, int], done: asyncio.Future) -> None:
+        """Drop a finished shared request."""
+        self._inflight.pop(key, None)
+        if not done.cancelled():
+            # Mark the error as retrieved in case every caller went away
+            done.exception()
+
+    async def _async_fetch(self, url: str) -> bytes:
+        """GET a raw body from the WLED device.
+
+        Failures are only logged at debug level; the coordinator reports a
+        device going offline once instead of on every poll.
+        """
+        await self._bucket.async_acquire()
+        with profiling.stage(self._host, "request"):
+            _LOGGER.debug("Sending GET request to %s", url)
+            started = time.perf_counter()
+            try:
+                async with self._async_connection(), self._session.get(
+                    url, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    _LOGGER.debug("Received response status: %s", response.status)
+                    response.raise_for_status() # Will raise error if status >= 400
+                    body = await response.read()
+
+                self.stats.record_request(time.perf_counter() - started, len(body))
+                return body
                 
-        except aiohttp.ClientResponseError as err:
-            _LOGGER.error("API GET request failed (ClientResponseError): %s", err)
-            raise WledApiError(f"API Error: {err}") from err
-        except aiohttp.ClientError as err:
-            _LOGGER.error("API GET request failed (ClientError): %s", err)
-            raise WledApiError(f"Client Error: {err}") from err
-        except async_timeout.TimeoutError:
-            _LOGGER.error("API GET request timed out for %s", self._host)
-            raise WledApiError(f"Timeout connecting to {self._host}") from TimeoutError
+            except asyncio.TimeoutError as err:
+                self.stats.record_error(err)
+                _LOGGER.debug("API GET request timed out for %s", self._host)
+                raise WledApiError(f"Timeout connecting to {self._host}") from err
+            except aiohttp.ClientResponseError as err:
+                self.stats.record_error(err)
+                _LOGGER.debug("API GET request failed (ClientResponseError): %s", err)
+                raise WledApiError(f"API Error: {err}") from err
+            except aiohttp.ClientError as err:
+                self.stats.record_error(err)
+                _LOGGER.debug("API GET request failed (ClientError): %s", err)
+                raise WledApiError(f"Client Error: {err}") from err
+            except Exception as err:
+                self.stats.record_error(err)
+                _LOGGER.debug("Unknown error during API GET request: %s", err)
+                raise WledApiError(f"Unknown Error: {err}") from err
+
+    async def async_ping(self) -> float:
+        """Time a round trip to the device in seconds.
+
+        Requests the tiny /version page and never joins a shared request, so
+        every call measures a real round trip.
+        """
+        await self._bucket.async_acquire()
+        started = time.perf_counter()
+        try:
+            async with self._async_connection(), self._session.get(
+                self._get_url_version, timeout=REQUEST_TIMEOUT
+            ) as response:
+                response.raise_for_status()
+                body = await response.read()
         except Exception as err:
-            _LOGGER.error("Unknown error during API GET request: %s", err)
-            raise WledApiError(f"Unknown Error: {err}") from err
+            self.stats.record_error(err)
+            raise WledApiError(f"Error pinging WLED at {self._host}: {err}") from err
+        latency = time.perf_counter() - started
+        self.stats.record_request(latency, len(body))
+        return latency
 
     async def async_set_sync_mode(self, mode: str) -> bool:
         """Set the sync mode (Off, Send, or Receive) via POST."""
@@ -60,31 +390,107 @@ class WledExtendedApiClient:
             USERMOD_POST_KEY: mode_value
         }
         
+        self._write_generation += 1
+        await self._bucket.async_acquire()
+        started = time.perf_counter()
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.post(self._post_url_settings, data=form_data)
+            async with self._async_connection(), self._session.post(
+                self._post_url_settings, data=form_data, timeout=REQUEST_TIMEOUT
+            ) as response:
                 response.raise_for_status()
-                return response.status == 200
+                body = await response.read()
         except Exception as err:
+            self.stats.record_error(err)
             raise WledApiError(f"Error sending command to WLED at {self._host}: {err}") from err
+        self.stats.record_request(time.perf_counter() - started, len(body))
+        # The new mode only shows up in info, so include it in the next poll
+        self.request_info()
+        return response.status == 200
 
-    async def async_set_audio_reactive(self, state: bool) -> bool:
+    async def async_set_audio_reactive(self, state: bool) -> WledAudioSnapshot:
         """Turn the Audio Reactive usermod on or off."""
+        return await self.async_set_state({"AudioReactive": {"enabled": state}})
+
+    async def async_set_state(self, payload: dict) -> WledAudioSnapshot:
+        """POST a JSON state change and return the resulting state.
+
+        "v" makes WLED answer with its full state instead of {"success": true},
+        so the returned snapshot (state fields only) can be used without
+        another GET.
+        """
         
-        payload = {
-            "AudioReactive": {
-                "enabled": state
-            }
-        }
-        
+        self._write_generation += 1
+        await self._bucket.async_acquire()
+        started = time.perf_counter()
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.post(self._post_url_state, json=payload)
+            async with self._async_connection(), self._session.post(
+                self._post_url_state, json={**payload, "v": True}, timeout=REQUEST_TIMEOUT
+            ) as response:
                 response.raise_for_status()
-                json_data = await response.json()
-                return json_data.get("success", False)
+                body = await response.read()
         except Exception as err:
-            raise WledApiError(f"Error sending AudioReactive command to WLED: {err}") from err
+            self.stats.record_error(err)
+            raise WledApiError(f"Error sending state command to WLED at {self._host}: {err}") from err
+        self.stats.record_request(time.perf_counter() - started, len(body))
+        snapshot = WledAudioSnapshot.from_json({"state": self._decode(body)})
+        self._merge_snapshot(snapshot)
+        return snapshot
+
+    async def async_get_config(self) -> WledAudioConfig:
+        """Get the Audio Reactive settings from the device configuration."""
+        return WledAudioConfig.from_json(await self._async_get_json(self._get_url_cfg))
+
+    async def async_set_config(self, payload: dict) -> None:
+        """POST a (partial) configuration change, which WLED merges and saves."""
+        self._write_generation += 1
+        await self._bucket.async_acquire()
+        started = time.perf_counter()
+        try:
+            async with self._async_connection(), self._session.post(
+                self._post_url_cfg, json=payload, timeout=REQUEST_TIMEOUT
+            ) as response:
+                response.raise_for_status()
+                body = await response.read()
+        except Exception as err:
+            self.stats.record_error(err)
+            raise WledApiError(f"Error sending configuration to WLED at {self._host}: {err}") from err
+        self.stats.record_request(time.perf_counter() - started, len(body))
+
+    async def async_listen(self, on_message: Callable[[WledAudioSnapshot], None]) -> None:
+        """Hold the WebSocket open and pass a snapshot of every pushed document to on_message.
+
+        WLED sends the full state and info on connect and again after every
+        change. This only returns by raising WledApiError once the socket drops.
+        """
+        _LOGGER.debug("Opening WebSocket to %s", self._ws_url)
+        try:
+            async with asyncio.timeout(CONNECT_TIMEOUT):
+                ws = await self._session.ws_connect(self._ws_url, heartbeat=WS_HEARTBEAT)
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise WledApiError(f"Could not open WebSocket to {self._host}: {err}") from err
+
+        try:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    try:
+                        json_data = json_loads(message.data)
+                    except ValueError:
+                        json_data = None
+                    if not isinstance(json_data, dict):
+                        _LOGGER.debug("Ignoring malformed WebSocket message from %s", self._host)
+                        continue
+                    if isinstance(json_data.get("info"), dict):
+                        self.performance.record(json_data["info"])
+                    if "state" in json_data:
+                        snapshot = WledAudioSnapshot.from_json(json_data)
+                        self._merge_snapshot(snapshot)
+                        on_message(snapshot)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    raise WledApiError(f"WebSocket error from {self._host}: {ws.exception()}")
+        finally:
+            await ws.close()
+
+        raise WledApiError(f"WebSocket to {self._host} closed")
 
 class WledApiError(Exception):
     """Exception to indicate an API error."""
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""Passive monitor of the Audio Reactive UDP sync traffic."""
+import asyncio
+import ipaddress
+import logging
+import socket
+import struct
+import time
+from collections import deque
+from datetime import timedelta
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    AUDIO_SYNC_GROUP,
+    AUDIO_SYNC_HISTORY,
+    AUDIO_SYNC_MAX_SENDERS,
+    AUDIO_SYNC_PORT,
+    SIGNAL_AUDIO_SYNC,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Headers of the usermod's sync packets, format version 1 and 2
+AUDIO_SYNC_HEADERS = (b"00001", b"00002")
+
+
+class AudioSyncSender:
+    """Counters of one device sending sync packets.
+
+    Inter-arrival gaps go to a fixed-size ring buffer, so memory does not
+    grow with the packet rate.
+    """
+
+    __slots__ = ("packets", "last_arrival", "last_seen", "gaps", "_published_packets", "_published_at")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.packets = 0
+        self.last_arrival: float | None = None
+        self.last_seen: float | None = None
+        self.gaps: deque[float] = deque(maxlen=AUDIO_SYNC_HISTORY)
+        self._published_packets = 0
+        self._published_at: float | None = None
+
+    def record(self, arrival: float) -> None:
+        """Count a packet received at arrival (event-loop time)."""
+        if self.last_arrival is not None:
+            self.gaps.append(arrival - self.last_arrival)
+        self.last_arrival = arrival
+        self.packets += 1
+
+    def gap_percentile(self, percentile: float) -> float | None:
+        """Return a percentile of the recent inter-arrival gaps in seconds."""
+        if not self.gaps:
+            return None
+        gaps = sorted(self.gaps)
+        return gaps[min(len(gaps) - 1, int(len(gaps) * percentile / 100))]
+
+    def rate(self, now: float) -> float | None:
+        """Return the packets per second since the previous call."""
+        rate = None
+        if self._published_at is not None and now > self._published_at:
+            rate = (self.packets - self._published_packets) / (now - self._published_at)
+        self._published_packets = self.packets
+        self._published_at = now
+        return rate
+
+
+class _AudioSyncProtocol(asyncio.DatagramProtocol):
+    """Counts valid sync packets per sender; does nothing else per packet."""
+
+    def __init__(self, monitor: "WledAudioSyncMonitor") -> None:
+        """Initialize the protocol."""
+        self._monitor = monitor
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        """Check the header and count the packet."""
+        if data[:5] not in AUDIO_SYNC_HEADERS:
+            return
+        self._monitor.record(addr[0])
+
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors."""
+        _LOGGER.debug("Audio sync socket error: %s", exc)
+
+
+class WledAudioSyncMonitor:
+    """Listens to the Audio Reactive multicast sync packets on the network.
+
+    Receiving packets only updates counters. Every publish_interval seconds
+    the monitor computes the packet rate, gap p95 and last-seen time of every
+    sender and signals SIGNAL_AUDIO_SYNC once, so sensors are written at
+    that low rate however many packets arrive.
+    """
+
+    def __init__(self, hass: HomeAssistant, publish_interval: float) -> None:
+        """Initialize the monitor."""
+        self.hass = hass
+        self._publish_interval = publish_interval
+        self._senders: dict[str, AudioSyncSender] = {}
+        # WLED hosts with sensors, and the address their packets come from
+        self._addresses: dict[str, str | None] = {}
+        self._resolve_task: asyncio.Task | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._unsub_publish: CALLBACK_TYPE | None = None
+        self.published: dict[str, dict] = {}
+
+    @property
+    def running(self) -> bool:
+        """Return True while the socket is open."""
+        return self._transport is not None
+
+    async def async_start(self) -> bool:
+        """Join the multicast group. Returns False if the socket can't be opened."""
+        try:
+            sock = _create_multicast_socket(AUDIO_SYNC_GROUP, AUDIO_SYNC_PORT)
+        except OSError as err:
+            _LOGGER.warning("Can't listen for audio sync packets on port %s: %s", AUDIO_SYNC_PORT, err)
+            return False
+        self._transport, _ = await self.hass.loop.create_datagram_endpoint(
+            lambda: _AudioSyncProtocol(self), sock=sock
+        )
+        self._unsub_publish = async_track_time_interval(
+            self.hass, self._async_publish, timedelta(seconds=self._publish_interval)
+        )
+        _LOGGER.debug("Listening for audio sync packets on %s:%s", AUDIO_SYNC_GROUP, AUDIO_SYNC_PORT)
+        return True
+
+    @callback
+    def async_stop(self) -> None:
+        """Leave the multicast group and stop publishing."""
+        if self._unsub_publish:
+            self._unsub_publish()
+            self._unsub_publish = None
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        if self._resolve_task and not self._resolve_task.done():
+            self._resolve_task.cancel()
+
+    def record(self, address: str) -> None:
+        """Count a packet from a sender."""
+        sender = self._senders.get(address)
+        if sender is None:
+            if len(self._senders) >= AUDIO_SYNC_MAX_SENDERS:
+                return
+            sender = self._senders[address] = AudioSyncSender()
+            # A new sender may be one of the hosts not matched yet
+            self._async_resolve_hosts()
+        sender.record(self.hass.loop.time())
+
+    @callback
+    def async_track_host(self, host: str) -> None:
+        """Match the packets of a WLED host to it from now on."""
+        if host in self._addresses:
+            return
+        try:
+            self._addresses[host] = str(ipaddress.IPv4Address(host))
+        except ValueError:
+            self._addresses[host] = None
+            if self._senders:
+                self._async_resolve_hosts()
+
+    @callback
+    def async_stats_for(self, host: str) -> dict | None:
+        """Return the last published statistics of a WLED host, if it sends."""
+        address = self._addresses.get(host)
+        return self.published.get(address) if address else None
+
+    @callback
+    def _async_resolve_hosts(self) -> None:
+        """Resolve the tracked host names not matched to an address yet."""
+        if self._resolve_task and not self._resolve_task.done():
+            return
+        if None not in self._addresses.values():
+            return
+        self._resolve_task = self.hass.async_create_background_task(
+            self._async_resolve_pending(), name="wled_extension audio sync resolve"
+        )
+
+    async def _async_resolve_pending(self) -> None:
+        """Find the IPv4 addresses packets from the unmatched hosts arrive from."""
+        for host in [host for host, address in self._addresses.items() if address is None]:
+            try:
+                addresses = await self.hass.loop.getaddrinfo(host, None, family=socket.AF_INET)
+            except OSError as err:
+                _LOGGER.debug("Can't resolve %s for audio sync statistics: %s", host, err)
+                continue
+            if addresses:
+                self._addresses[host] = addresses[0][4][0]
+
+    @callback
+    def _async_publish(self, _now=None) -> None:
+        """Summarize every sender and notify the sensors once."""
+        now = self.hass.loop.time()
+        wall_now = time.time()
+        published = {}
+        for address, sender in self._senders.items():
+            gap = sender.gap_percentile(95)
+            published[address] = {
+                "packets_per_second": sender.rate(now),
+                "gap_p95": gap,
+                # Wall-clock time of the last packet, for timestamp sensors
+                "last_seen": (
+                    None if sender.last_arrival is None else wall_now - (now - sender.last_arrival)
+                ),
+            }
+        self.published = published
+        async_dispatcher_send(self.hass, SIGNAL_AUDIO_SYNC)
+
+
+def _create_multicast_socket(group: str, port: int) -> socket.socket:
+    """Create a non-blocking UDP socket joined to a multicast group."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        # WLED devices or other listeners on this host may use the port as well
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", port))
+        membership = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton("0.0.0.0"))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
@@ -0,0 +1,53 @@
+"""Persistent cache of the capabilities of WLED devices."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CAPABILITIES_SAVE_DELAY, DOMAIN
+from .models import DeviceCapabilities
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+
+
+class WledCapabilityStore:
+    """Capabilities of every device by MAC address, saved across restarts.
+
+    Each entry records the firmware version it was detected on; the client
+    detects again once a device reports another version, and the new result
+    replaces the entry.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._capabilities: dict[str, DeviceCapabilities] = {}
+
+    async def async_load(self) -> None:
+        """Load the saved capabilities."""
+        data = await self._store.async_load() or {}
+        self._capabilities = {
+            mac: DeviceCapabilities.from_dict(capabilities) for mac, capabilities in data.items()
+        }
+        _LOGGER.debug("Loaded capabilities of %d WLED devices", len(self._capabilities))
+
+    @callback
+    def async_get(self, mac: str) -> DeviceCapabilities | None:
+        """Return the saved capabilities of a device."""
+        return self._capabilities.get(mac)
+
+    @callback
+    def async_update(self, mac: str, capabilities: DeviceCapabilities) -> None:
+        """Remember the capabilities of a device, saving them if they changed."""
+        if self._capabilities.get(mac) == capabilities:
+            return
+        self._capabilities[mac] = capabilities
+        self._store.async_delay_save(self._data_to_save, CAPABILITIES_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict]:
+        """Return the data to save."""
+        return {mac: capabilities.as_dict() for mac, capabilities in self._capabilities.items()}
@@ -0,0 +1,123 @@
+"""Per-device command batching for WLED Extended."""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+
+from . import profiling
+from .api import WledApiError, WledExtendedApiClient
+from .const import COMMAND_DEBOUNCE
+from .models import WledAudioSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def merge_state(target: dict, changes: dict) -> dict:
+    """Deep-merge a JSON state change into target, later values winning."""
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_state(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+class WledCommandQueue:
+    """Collects the commands for one device and sends as few requests as possible.
+
+    A command arriving while the queue is idle is sent right away, together
+    with anything queued in the same event-loop turn (e.g. by one service
+    call). During a burst, i.e. within COMMAND_DEBOUNCE seconds of the
+    previous batch, commands wait that long and form one batch. Within a
+    batch the last value of every setting wins and all JSON state changes
+    are merged into one /json/state request; a sync mode, which WLED only
+    takes as a usermod setting, is one more request. Every caller of the
+    batch awaits the same result.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: WledExtendedApiClient,
+        on_state: Callable[[WledAudioSnapshot], None],
+        on_refresh: Callable[[], Awaitable[None]],
+    ):
+        """Initialize the queue.
+
+        on_state receives the state returned by a JSON command, on_refresh is
+        awaited when a command's response does not carry the new state.
+        """
+        self.hass = hass
+        self._api = api_client
+        self._on_state = on_state
+        self._on_refresh = on_refresh
+        self._pending_state: dict = {}
+        self._pending_sync_mode: str | None = None
+        self._batch: asyncio.Task | None = None
+        self._last_batch = float("-inf")
+
+    async def async_set_audio_reactive(self, enabled: bool) -> None:
+        """Queue turning the Audio Reactive usermod on or off."""
+        await self.async_set_state({"AudioReactive": {"enabled": enabled}})
+
+    async def async_set_state(self, changes: dict) -> None:
+        """Queue a JSON state change."""
+        merge_state(self._pending_state, changes)
+        await self._async_join_batch()
+
+    async def async_set_sync_mode(self, mode: str) -> None:
+        """Queue a sync mode change (Off, Send, or Receive)."""
+        self._pending_sync_mode = mode
+        await self._async_join_batch()
+
+    async def async_cancel(self) -> None:
+        """Drop any queued commands."""
+        batch, self._batch = self._batch, None
+        self._pending_state = {}
+        self._pending_sync_mode = None
+        if batch and not batch.done():
+            batch.cancel()
+
+    async def _async_join_batch(self) -> None:
+        """Wait for the batch the queued command belongs to."""
+        if self._batch is None:
+            self._batch = self.hass.async_create_background_task(
+                self._async_send_batch(), name="wled_extension command batch"
+            )
+        # A caller going away must not cancel the batch for everybody else
+        await asyncio.shield(self._batch)
+
+    async def _async_send_batch(self) -> None:
+        """Send everything queued during the debounce window."""
+        if self.hass.loop.time() - self._last_batch < COMMAND_DEBOUNCE:
+            await asyncio.sleep(COMMAND_DEBOUNCE)
+        else:
+            # Idle: only let the rest of this event-loop turn join the batch
+            await asyncio.sleep(0)
+
+        # Commands arriving from here on start the next batch
+        self._batch = None
+        self._last_batch = self.hass.loop.time()
+        state, self._pending_state = self._pending_state, {}
+        sync_mode, self._pending_sync_mode = self._pending_sync_mode, None
+
+        needs_refresh = sync_mode is not None
+        try:
+            with profiling.stage(self._api.host, "command"):
+                if state:
+                    new_state = await self._api.async_set_state(state)
+                    if new_state.ar_enabled is not None:
+                        self._on_state(new_state)
+                    else:
+                        needs_refresh = True
+                if sync_mode is not None:
+                    # The settings form does not answer with any state
+                    await self._api.async_set_sync_mode(sync_mode)
+        except WledApiError:
+            # Find out what actually got applied before reporting the error
+            await self._on_refresh()
+            raise
+
+        if needs_refresh:
+            await self._on_refresh()
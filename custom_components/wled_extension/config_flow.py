@@ -1,7 +1,26 @@
 from homeassistant import config_entries
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import callback
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    CONF_AUDIO_SYNC_INTERVAL,
+    CONF_AUDIO_SYNC_MONITOR,
+    CONF_FAST_START,
+    CONF_INTERVAL_OVERRIDES,
+    CONF_MAX_CONCURRENT,
+    CONF_PERFORMANCE_INTERVAL,
+    CONF_PIGGYBACK,
+    DEFAULT_AUDIO_SYNC_INTERVAL,
+    DEFAULT_AUDIO_SYNC_MONITOR,
+    DEFAULT_FAST_START,
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_PERFORMANCE_INTERVAL,
+    DEFAULT_PIGGYBACK,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .scheduler import parse_interval_overrides
 
 @config_entries.HANDLERS.register(DOMAIN)
 class WledExtendedConfigFlow(config_entries.ConfigFlow):
@@ -9,6 +28,12 @@ class WledExtendedConfigFlow(config_entries.ConfigFlow):
     
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow handler."""
+        return WledExtendedOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         
@@ -26,4 +51,61 @@ class WledExtendedConfigFlow(config_entries.ConfigFlow):
         # Show the confirmation form
         return self.async_show_form(
             step_id="user"
-        )
\ No newline at end of file
+        )
+
+
+class WledExtendedOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for WLED Extended."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_interval_overrides(user_input.get(CONF_INTERVAL_OVERRIDES, ""))
+            except ValueError:
+                errors[CONF_INTERVAL_OVERRIDES] = "invalid_overrides"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PIGGYBACK,
+                        default=options.get(CONF_PIGGYBACK, DEFAULT_PIGGYBACK),
+                    ): bool,
+                    vol.Optional(
+                        CONF_FAST_START,
+                        default=options.get(CONF_FAST_START, DEFAULT_FAST_START),
+                    ): bool,
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT,
+                        default=options.get(CONF_MAX_CONCURRENT, DEFAULT_MAX_CONCURRENT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+                    vol.Optional(
+                        CONF_INTERVAL_OVERRIDES,
+                        default=options.get(CONF_INTERVAL_OVERRIDES, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_PERFORMANCE_INTERVAL,
+                        default=options.get(CONF_PERFORMANCE_INTERVAL, DEFAULT_PERFORMANCE_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Optional(
+                        CONF_AUDIO_SYNC_MONITOR,
+                        default=options.get(CONF_AUDIO_SYNC_MONITOR, DEFAULT_AUDIO_SYNC_MONITOR),
+                    ): bool,
+                    vol.Optional(
+                        CONF_AUDIO_SYNC_INTERVAL,
+                        default=options.get(CONF_AUDIO_SYNC_INTERVAL, DEFAULT_AUDIO_SYNC_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                }
+            ),
+            errors=errors,
+        )
@@ -1,3 +1,97 @@
 """Constants for the WLED Extended integration."""
 DOMAIN = "wled_extension"
-USERMOD_POST_KEY = "AudioReactive:sync:mode"
\ No newline at end of file
+USERMOD_POST_KEY = "AudioReactive:sync:mode"
+
+# Dispatcher signals: a list of newly set up WLED entry IDs / one removed entry ID
+SIGNAL_NEW_DEVICES = f"{DOMAIN}_new_device"
+SIGNAL_REMOVE_DEVICE = f"{DOMAIN}_remove_device"
+# Sent when the device performance sensors should write their state
+SIGNAL_PERFORMANCE = f"{DOMAIN}_performance"
+# Sent whenever new audio sync statistics have been published
+SIGNAL_AUDIO_SYNC = f"{DOMAIN}_audio_sync"
+
+# Domain of the core WLED integration we extend
+WLED_DOMAIN = "wled"
+
+# Options
+CONF_PIGGYBACK = "piggyback"
+DEFAULT_PIGGYBACK = False
+CONF_MAX_CONCURRENT = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT = 4
+CONF_INTERVAL_OVERRIDES = "interval_overrides"
+CONF_FAST_START = "fast_start"
+DEFAULT_FAST_START = False
+CONF_PERFORMANCE_INTERVAL = "performance_interval"
+DEFAULT_PERFORMANCE_INTERVAL = 60
+CONF_AUDIO_SYNC_MONITOR = "audio_sync_monitor"
+DEFAULT_AUDIO_SYNC_MONITOR = False
+CONF_AUDIO_SYNC_INTERVAL = "audio_sync_interval"
+DEFAULT_AUDIO_SYNC_INTERVAL = 30
+
+# Attribute set while an entity shows its restored state from before the restart
+ATTR_RESTORED = "restored"
+
+# Polling is only used while the WebSocket push connection is down
+DEFAULT_SCAN_INTERVAL = 10
+
+# Regular polls only fetch /json/state; info (sync mode, version) is included
+# on every Nth poll, and on the next poll after a sync mode change
+INFO_REFRESH_POLLS = 6
+
+# The Audio Reactive configuration (/json/cfg) is cached this long (seconds);
+# writes and firmware updates refresh it early
+CONFIG_TTL = 900
+
+# Device performance figures from info: values kept per figure, and the
+# thresholds whose crossing updates the sensors right away
+PERFORMANCE_WINDOW = 30
+PERFORMANCE_FPS_LOW = 20
+PERFORMANCE_HEAP_LOW = 20000
+PERFORMANCE_RSSI_LOW = -80
+
+# Seconds to collect capability changes before saving them to storage
+CAPABILITIES_SAVE_DELAY = 10
+
+# A device saved without the Audio Reactive usermod is skipped at setup for
+# this long (seconds) if its firmware version is unchanged, then checked again
+CAPABILITIES_TTL = 86400
+
+# Reconnect backoff for the WebSocket push connection (seconds)
+WS_RECONNECT_MIN = 1
+WS_RECONNECT_MAX = 60
+WS_HEARTBEAT = 30
+
+# ESP web servers only accept a handful of sockets, one of which may be held
+# by the WebSocket, so each device gets at most this many HTTP requests at once
+CONNECTIONS_PER_HOST = 2
+
+# Request timeouts (seconds): fail fast on dead hosts, be patient with slow replies
+CONNECT_TIMEOUT = 3
+READ_TIMEOUT = 10
+# Bounds a whole request, and separately the wait for a free connection slot
+TOTAL_TIMEOUT = 20
+
+# Device health: exponential backoff, then a circuit breaker whose probes keep
+# backing off; probes are at least CIRCUIT_PROBE_INTERVAL apart
+BACKOFF_MAX = 300
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_PROBE_INTERVAL = 60
+
+# Poll faster for a short while after a user command so the UI converges
+BOOST_INTERVAL = 2
+BOOST_DURATION = 30
+
+# Per-host token bucket: sustained requests per second and burst size
+RATE_LIMIT_PER_SECOND = 4
+RATE_LIMIT_BURST = 4
+
+# Commands sent to one device within this window (seconds) of the previous
+# batch go out together; the first command after a quiet period is sent at once
+COMMAND_DEBOUNCE = 0.2
+
+# Audio Reactive UDP sync: the usermod's default multicast group and port,
+# the inter-arrival gaps kept per sender and the most senders tracked
+AUDIO_SYNC_GROUP = "239.0.0.1"
+AUDIO_SYNC_PORT = 11988
+AUDIO_SYNC_HISTORY = 256
+AUDIO_SYNC_MAX_SENDERS = 64
@@ -1,29 +1,288 @@
+import asyncio
 import logging
+from contextlib import suppress
 from datetime import timedelta
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from . import profiling
 from .api import WledExtendedApiClient, WledApiError
-from .const import DOMAIN
+from .commands import WledCommandQueue
+from .const import (
+    BACKOFF_MAX,
+    CONFIG_TTL,
+    DOMAIN,
+    WS_RECONNECT_MAX,
+    WS_RECONNECT_MIN,
+)
+from .health import DeviceHealth
+from .models import WledAudioConfig, WledAudioSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 class WledExtendedDataCoordinator(DataUpdateCoordinator):
-    """Manages polling for WLED usermod data."""
-    
+    """Manages push and polling updates for WLED usermod data.
+
+    The coordinator has no timer of its own; polls are driven by the shared
+    WledPollScheduler, which skips devices where should_poll is False. Its
+    data is a WledAudioSnapshot, and listeners are only notified when the
+    snapshot actually changed.
+    """
+
     def __init__(self, hass, api_client: WledExtendedApiClient, host: str):
         """Initialize the coordinator."""
         self.api_client = api_client
         self.host = host
-        
+        # Filled in once at setup and shared by every platform's entities
+        self.device_name: str = host
+        self.device_identifiers: set[tuple[str, str]] | None = None
+        self.health = DeviceHealth()
+        self.commands = WledCommandQueue(
+            hass, api_client, self.async_apply_state, self.async_request_refresh
+        )
+        self._ws_task: asyncio.Task | None = None
+        self._ws_connected = False
+        self._core_coordinator: DataUpdateCoordinator | None = None
+        self._unsub_core: CALLBACK_TYPE | None = None
+        self.config = WledConfigCoordinator(hass, self)
+
         super().__init__(
             hass,
             _LOGGER,
             name=f"WLED SR ({host})",
-            update_interval=timedelta(seconds=10),  # Poll every 10 seconds
+            update_interval=None,
+            always_update=False,
         )
 
+    @property
+    def websocket_connected(self) -> bool:
+        """Return True while state is being pushed over the WebSocket."""
+        return self._ws_connected
+
+    @property
+    def piggybacked(self) -> bool:
+        """Return True while updates are driven by the core WLED coordinator."""
+        return self._unsub_core is not None
+
+    @property
+    def should_poll(self) -> bool:
+        """Return True if the scheduler needs to poll this device."""
+        return not self._ws_connected and not self.piggybacked
+
     async def _async_update_data(self):
         """Fetch data from API."""
+        with profiling.stage(self.host, "update"):
+            self.api_client.stats.polls += 1
+            previous_version = self.data.version if self.data is not None else None
+            try:
+                data = await self.api_client.async_get_data()
+            except WledApiError as err:
+                if self.health.record_failure():
+                    _LOGGER.warning(
+                        "%s is unreachable, probing it with a growing delay (up to %s seconds) until it answers",
+                        self.host,
+                        BACKOFF_MAX,
+                    )
+                raise UpdateFailed(f"Error fetching data: {err}") from err
+            self.health.record_success()
+            if previous_version and data.version and data.version != previous_version:
+                _LOGGER.debug("%s was updated to %s", self.host, data.version)
+                self.config.async_invalidate()
+            return data
+
+    async def async_probe(self) -> None:
+        """Send a cheap request to an offline device and refresh if it answers."""
+        try:
+            # /version is a few bytes, unlike the full info document
+            await self.api_client.async_ping()
+        except WledApiError as err:
+            _LOGGER.debug("Probe of %s failed: %s", self.host, err)
+            # Keeps the probes backing off
+            self.health.record_failure()
+            return
+        _LOGGER.info("%s answered a probe, resuming polling", self.host)
+        self.health.record_success()
+        await self.async_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the entities, timing it while profiling."""
+        with profiling.stage(self.host, "dispatch"):
+            super().async_update_listeners()
+
+    @callback
+    def async_apply_state(self, snapshot: WledAudioSnapshot) -> None:
+        """Merge the state returned by a command into the current data."""
+        self._async_set_snapshot(snapshot)
+
+    @callback
+    def _async_set_snapshot(self, snapshot: WledAudioSnapshot) -> None:
+        """Merge a (possibly partial) snapshot and notify listeners if it changed."""
+        if self.data is not None:
+            snapshot = self.data.merged(snapshot)
+        if snapshot == self.data and self.last_update_success:
+            return
+        self.async_set_updated_data(snapshot)
+
+    @callback
+    def async_boost(self) -> None:
+        """Poll faster for a short while after a user command."""
+        self.health.boost()
+
+    async def async_shutdown(self) -> None:
+        """Stop push updates and piggybacking, then cancel any pending work."""
+        await self.commands.async_cancel()
+        self.api_client.async_cancel_requests()
+        await self.async_stop_websocket()
+        self.async_detach_from_core()
+        await self.config.async_shutdown()
+        await super().async_shutdown()
+
+    @callback
+    def async_use_core(self, core_coordinator: DataUpdateCoordinator | None) -> None:
+        """Piggyback on a core WLED coordinator, or without one, push and poll.
+
+        Called at setup and whenever the core WLED entry is loaded or
+        unloaded, since a reload of the core entry replaces its coordinator.
+        """
+        if core_coordinator is not None and core_coordinator is self._core_coordinator:
+            return
+        self.async_detach_from_core()
+        if core_coordinator is None:
+            self.async_start_websocket()
+            return
+        if self._ws_task is not None:
+            # Core updates drive the refreshes now
+            task, self._ws_task = self._ws_task, None
+            task.cancel()
+            self._ws_connected = False
+        self.async_attach_to_core(core_coordinator)
+
+    @callback
+    def async_attach_to_core(self, core_coordinator: DataUpdateCoordinator) -> None:
+        """Refresh only when the core WLED coordinator has refreshed the same device.
+
+        The core integration already polls (or is pushed) the full device state,
+        so scheduled polls are skipped and each core update triggers one
+        debounced supplementary request for the Audio Reactive fields.
+        """
+        if self._unsub_core is not None:
+            return
+        _LOGGER.debug("Piggybacking %s on the core WLED coordinator", self.host)
+        self._core_coordinator = core_coordinator
+        self._unsub_core = core_coordinator.async_add_listener(self._async_handle_core_update)
+
+    @callback
+    def async_detach_from_core(self) -> None:
+        """Stop following the core WLED coordinator."""
+        if self._unsub_core is None:
+            return
+        self._unsub_core()
+        self._unsub_core = None
+        self._core_coordinator = None
+
+    @callback
+    def _async_handle_core_update(self) -> None:
+        """Fetch our fields after the core coordinator got fresh data."""
+        core_coordinator = self._core_coordinator
+        if not core_coordinator.last_update_success:
+            # The device is unreachable for the core integration as well, so
+            # our entities go unavailable too; the core's next success
+            # refreshes them again
+            self.health.record_failure()
+            self.async_set_update_error(
+                core_coordinator.last_exception or UpdateFailed(f"{self.host} is unreachable")
+            )
+            return
+        # The request debouncer collapses bursts of core updates (e.g. pushes)
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_start_websocket(self) -> None:
+        """Start the push connection in the background."""
+        if self._ws_task is None:
+            self._ws_task = self.hass.async_create_background_task(
+                self._async_run_websocket(), name=f"{DOMAIN} websocket {self.host}"
+            )
+
+    async def async_stop_websocket(self) -> None:
+        """Close the push connection and stop reconnecting."""
+        task, self._ws_task = self._ws_task, None
+        if task is None:
+            return
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        self._ws_connected = False
+
+    async def _async_run_websocket(self) -> None:
+        """Keep the WebSocket connected, polling whenever it is down."""
+        delay = WS_RECONNECT_MIN
+        while True:
+            try:
+                await self.api_client.async_listen(self._async_handle_push)
+            except WledApiError as err:
+                _LOGGER.debug("WebSocket to %s unavailable: %s", self.host, err)
+
+            if self._ws_connected:
+                # The socket was up, so start the backoff over and poll until it is back
+                self._ws_connected = False
+                delay = WS_RECONNECT_MIN
+                _LOGGER.info("WebSocket to %s dropped, falling back to polling", self.host)
+                # Changes may have been missed while the socket was dying
+                self.api_client.request_info()
+                await self.async_request_refresh()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WS_RECONNECT_MAX)
+
+    @callback
+    def _async_handle_push(self, snapshot: WledAudioSnapshot) -> None:
+        """Merge a pushed state document into the coordinator data."""
+        if not self._ws_connected:
+            _LOGGER.debug("WebSocket to %s connected, pausing polling", self.host)
+            self._ws_connected = True
+
+        self._async_set_snapshot(snapshot)
+
+
+class WledConfigCoordinator(DataUpdateCoordinator):
+    """Slow tier holding the Audio Reactive configuration of one device.
+
+    The configuration is a cache with a CONFIG_TTL time to live, refreshed
+    early after a write or a firmware update. Like any coordinator it only
+    refreshes while it has listeners, so a device without enabled
+    configuration entities never fetches /json/cfg. Its requests are rare
+    enough not to need the poll scheduler; it does skip devices the fast
+    tier found offline.
+    """
+
+    def __init__(self, hass, device: WledExtendedDataCoordinator):
+        """Initialize the coordinator."""
+        self.device = device
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"WLED SR config ({device.host})",
+            update_interval=timedelta(seconds=CONFIG_TTL),
+            always_update=False,
+        )
+
+    async def _async_update_data(self) -> WledAudioConfig:
+        """Fetch the configuration from the API."""
+        if self.device.health.circuit_open:
+            raise UpdateFailed(f"{self.device.host} is offline")
         try:
-            return await self.api_client.async_get_data()
+            return await self.device.api_client.async_get_config()
         except WledApiError as err:
-            raise UpdateFailed(f"Error fetching data: {err}") from err
\ No newline at end of file
+            raise UpdateFailed(f"Error fetching configuration: {err}") from err
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Drop the cached configuration, refetching it if it is in use."""
+        if self.data is not None:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_set_config(self, changes: dict) -> None:
+        """Change Audio Reactive settings, then refresh the cache."""
+        await self.device.api_client.async_set_config({"um": {"AudioReactive": changes}})
+        await self.async_request_refresh()
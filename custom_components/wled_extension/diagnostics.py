@@ -0,0 +1,48 @@
+"""Diagnostics support for WLED Extended."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .manager import WledCoordinatorManager
+
+TO_REDACT = {"mac"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for the config entry, with request statistics per device."""
+    manager: WledCoordinatorManager = hass.data[DOMAIN]["manager"]
+
+    devices = {}
+    for wled_entry_id, coordinator in manager.coordinators.items():
+        snapshot = coordinator.data
+        devices[wled_entry_id] = {
+            "host": coordinator.host,
+            "name": coordinator.device_name,
+            "firmware": coordinator.api_client.firmware_version,
+            "last_update_success": coordinator.last_update_success,
+            "websocket_connected": coordinator.websocket_connected,
+            "piggybacked": coordinator.piggybacked,
+            "consecutive_failures": coordinator.health.failures,
+            "circuit_open": coordinator.health.circuit_open,
+            "data": {
+                name: getattr(snapshot, name) for name in snapshot.__slots__
+            } if snapshot is not None else None,
+            "config": {
+                name: getattr(config, name) for name in config.__slots__
+            } if (config := coordinator.config.data) is not None else None,
+            "requests": coordinator.api_client.stats.as_dict(),
+        }
+
+    return async_redact_data(
+        {
+            "options": dict(entry.options),
+            "live_coordinators": manager.live_count,
+            "devices": devices,
+        },
+        TO_REDACT,
+    )
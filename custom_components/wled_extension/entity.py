@@ -0,0 +1,194 @@
+"""Shared entity helpers for WLED Extended."""
+import logging
+from collections.abc import Callable
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import profiling
+from .audio_sync import WledAudioSyncMonitor
+from .const import (
+    ATTR_RESTORED,
+    DOMAIN,
+    SIGNAL_AUDIO_SYNC,
+    SIGNAL_NEW_DEVICES,
+    SIGNAL_REMOVE_DEVICE,
+)
+from .coordinator import WledConfigCoordinator, WledExtendedDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _device_info(coordinator: WledExtendedDataCoordinator) -> DeviceInfo:
+    """Return the device info attaching our entities to the core WLED device."""
+    if coordinator.device_identifiers:
+        return {"identifiers": coordinator.device_identifiers}
+    return {
+        "identifiers": {(DOMAIN, coordinator.host)},
+        "name": f"{coordinator.device_name} Extended",
+        "manufacturer": "WLED",
+    }
+
+
+class WledExtendedEntity(CoordinatorEntity[WledExtendedDataCoordinator], RestoreEntity):
+    """Base class for entities attached to a WLED device.
+
+    Until the coordinator has fetched its first data, the entity can show the
+    state it had before the restart (see restored_state).
+    """
+
+    _attr_has_entity_name = True
+    _restored_state: State | None = None
+
+    def __init__(self, coordinator: WledExtendedDataCoordinator) -> None:
+        """Initialize the entity and attach it to the core WLED device."""
+        super().__init__(coordinator)
+        self._attr_device_info = _device_info(coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the last known state in case the device has not answered yet."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            self._restored_state = last_state
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, timing it while profiling."""
+        with profiling.stage(self.coordinator.host, "state_write"):
+            super().async_write_ha_state()
+
+    @property
+    def restored_state(self) -> State | None:
+        """Return the state from before the restart while no fresh data has arrived."""
+        if self.coordinator.data is None:
+            return self._restored_state
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag a restored, possibly stale state."""
+        if self.restored_state is not None:
+            return {ATTR_RESTORED: True}
+        return None
+
+
+class WledConfigEntity(CoordinatorEntity[WledConfigCoordinator]):
+    """Base class for entities showing a device's Audio Reactive configuration."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: WledConfigCoordinator) -> None:
+        """Initialize the entity and attach it to the core WLED device."""
+        super().__init__(coordinator)
+        self._attr_device_info = _device_info(coordinator.device)
+
+    async def async_added_to_hass(self) -> None:
+        """Fetch the configuration the first time one of its entities is added."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None:
+            # Debounced, so a device's entities share one request
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, timing it while profiling."""
+        with profiling.stage(self.coordinator.device.host, "state_write"):
+            super().async_write_ha_state()
+
+
+class WledAudioSyncEntity(Entity):
+    """Base class for entities showing the audio sync packets a device sends.
+
+    They are written each time the monitor publishes, not per packet, and are
+    unavailable while no packets from the device have been seen.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self, coordinator: WledExtendedDataCoordinator, monitor: WledAudioSyncMonitor
+    ) -> None:
+        """Initialize the entity and attach it to the core WLED device."""
+        self._host = coordinator.host
+        self._monitor = monitor
+        self._attr_device_info = _device_info(coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever new statistics are published."""
+        self._monitor.async_track_host(self._host)
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_AUDIO_SYNC, self.async_write_ha_state)
+        )
+
+    @property
+    def audio_sync_stats(self) -> dict | None:
+        """Return the last published statistics of this device."""
+        return self._monitor.async_stats_for(self._host)
+
+    @property
+    def available(self) -> bool:
+        """Return True once the device has been seen sending."""
+        return self.audio_sync_stats is not None
+
+
+@callback
+def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    entity_factory: Callable[[WledExtendedDataCoordinator], list[Entity]],
+) -> None:
+    """Create a platform's entities for every known and future WLED device.
+
+    Devices are announced in batches, and each batch is added with a single
+    async_add_entities call.
+    """
+    current_entities: dict[str, list[Entity]] = {}
+
+    @callback
+    def async_add_new_devices(wled_entry_ids: list[str]) -> None:
+        """Add entities for newly set up WLED devices."""
+        coordinators = hass.data[DOMAIN]["manager"].coordinators
+        new_entities = []
+        for wled_entry_id in wled_entry_ids:
+            if wled_entry_id in current_entities:
+                continue
+            coordinator = coordinators.get(wled_entry_id)
+            if not coordinator:
+                _LOGGER.error("Coordinator for %s not found in hass.data", wled_entry_id)
+                continue
+            entities = entity_factory(coordinator)
+            current_entities[wled_entry_id] = entities
+            new_entities.extend(entities)
+
+        if new_entities:
+            _LOGGER.debug("Adding %d entities for %d devices", len(new_entities), len(wled_entry_ids))
+            async_add_entities(new_entities)
+
+    @callback
+    def async_remove_device(wled_entry_id: str) -> None:
+        """Remove the entities of a removed WLED device."""
+        for entity in current_entities.pop(wled_entry_id, []):
+            hass.async_create_task(entity.async_remove())
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_NEW_DEVICES, async_add_new_devices)
+    )
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_REMOVE_DEVICE, async_remove_device)
+    )
+
+    async_add_new_devices(list(hass.data[DOMAIN]["manager"].coordinators))
@@ -0,0 +1,58 @@
+"""Per-device health tracking for WLED Extended."""
+import time
+
+from .const import (
+    BACKOFF_MAX,
+    BOOST_DURATION,
+    BOOST_INTERVAL,
+    CIRCUIT_PROBE_INTERVAL,
+    CIRCUIT_THRESHOLD,
+)
+
+
+class DeviceHealth:
+    """Tracks consecutive failures of one device and derives its poll delay.
+
+    After each failure the delay doubles, up to BACKOFF_MAX. Once
+    CIRCUIT_THRESHOLD polls in a row have failed the circuit opens: regular
+    polls stop and only a cheap probe is sent until the device answers
+    again. Failed probes keep counting, so probes follow the same backoff
+    (never more often than every CIRCUIT_PROBE_INTERVAL seconds) and the
+    delay never shrinks while the device stays offline.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a healthy device."""
+        self.failures = 0
+        self._boost_until = 0.0
+
+    @property
+    def circuit_open(self) -> bool:
+        """Return True if the device is treated as offline."""
+        return self.failures >= CIRCUIT_THRESHOLD
+
+    def record_success(self) -> bool:
+        """Reset the failure count. Returns True if the circuit was open."""
+        was_open = self.circuit_open
+        self.failures = 0
+        return was_open
+
+    def record_failure(self) -> bool:
+        """Count a failed request. Returns True if this failure opened the circuit."""
+        self.failures += 1
+        return self.failures == CIRCUIT_THRESHOLD
+
+    def boost(self) -> None:
+        """Poll quickly for a while, e.g. after a user command."""
+        self._boost_until = time.monotonic() + BOOST_DURATION
+
+    def next_interval(self, interval: float) -> float:
+        """Return the delay before the next poll given the regular interval."""
+        if self.failures:
+            backoff = min(interval * 2 ** self.failures, BACKOFF_MAX)
+            if self.circuit_open:
+                return min(max(backoff, CIRCUIT_PROBE_INTERVAL), BACKOFF_MAX)
+            return backoff
+        if time.monotonic() < self._boost_until:
+            return min(interval, BOOST_INTERVAL)
+        return interval
@@ -0,0 +1,131 @@
+"""Lifecycle management of the device coordinators of WLED Extended."""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Coroutine, Iterable, Mapping
+from types import MappingProxyType
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .api import WledApiError
+from .const import DOMAIN
+from .coordinator import WledExtendedDataCoordinator
+from .scheduler import WledPollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Create the HTTP session shared by all WLED devices.
+
+    It is a Home Assistant managed session on the shared connector, closed
+    when Home Assistant stops (and by the manager on unload). Home Assistant
+    does not let it have a connector of its own, so each API client limits
+    itself to CONNECTIONS_PER_HOST requests at a time instead.
+    """
+    return async_create_clientsession(hass)
+
+
+class WledCoordinatorManager:
+    """Owns every device coordinator and everything running on its behalf.
+
+    Removing a device (or shutting the manager down on unload/reload) takes
+    it off the scheduler, cancels its background tasks, in-flight requests and
+    queued commands, and closes its WebSocket, so nothing keeps polling. The
+    manager also owns the HTTP session and closes it last.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        scheduler: WledPollScheduler,
+        session: aiohttp.ClientSession,
+    ):
+        """Initialize the manager."""
+        self.hass = hass
+        self.scheduler = scheduler
+        self.session = session
+        self.closed = False
+        self._coordinators: dict[str, WledExtendedDataCoordinator] = {}
+        self._tasks: dict[str, set[asyncio.Task]] = {}
+
+    @property
+    def coordinators(self) -> Mapping[str, WledExtendedDataCoordinator]:
+        """Return the live coordinators by WLED entry ID."""
+        return MappingProxyType(self._coordinators)
+
+    @property
+    def live_count(self) -> int:
+        """Return the number of live coordinators."""
+        return len(self._coordinators)
+
+    def __contains__(self, wled_entry_id: str) -> bool:
+        """Return True if a coordinator exists for the WLED entry."""
+        return wled_entry_id in self._coordinators
+
+    @callback
+    def async_add(self, wled_entry_id: str, coordinator: WledExtendedDataCoordinator) -> None:
+        """Take ownership of a coordinator and start polling it."""
+        self._coordinators[wled_entry_id] = coordinator
+        self.scheduler.async_register(wled_entry_id, coordinator)
+        _LOGGER.debug("%d live WLED Extended coordinators", self.live_count)
+
+    @callback
+    def async_create_task(
+        self, wled_entry_id: str, target: Coroutine[Any, Any, Any], name: str
+    ) -> asyncio.Task:
+        """Run a background task that is cancelled when the device goes away."""
+        task = self.hass.async_create_background_task(target, name=f"{DOMAIN} {name}")
+        tasks = self._tasks.setdefault(wled_entry_id, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+
+    async def async_run_on_devices(
+        self,
+        coordinators: Iterable[WledExtendedDataCoordinator],
+        send: Callable[[WledExtendedDataCoordinator], Awaitable[None]],
+        timeout: float,
+    ) -> dict[str, dict]:
+        """Run send for many devices concurrently, within the request limit.
+
+        Returns {"success": ..., "error": ...} per host; one slow or failing
+        device does not hold up or fail the others.
+        """
+
+        async def _async_run(coordinator: WledExtendedDataCoordinator) -> dict:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self.scheduler.async_limited(send(coordinator))
+            except TimeoutError:
+                return {"success": False, "error": f"No answer within {timeout} seconds"}
+            except WledApiError as err:
+                return {"success": False, "error": str(err)}
+            return {"success": True, "error": None}
+
+        coordinators = list(coordinators)
+        results = await asyncio.gather(*(_async_run(c) for c in coordinators))
+        return {coordinator.host: result for coordinator, result in zip(coordinators, results)}
+
+    async def async_remove(self, wled_entry_id: str) -> bool:
+        """Stop and release a device's coordinator. Returns False if it was unknown."""
+        self.scheduler.async_unregister(wled_entry_id)
+        for task in self._tasks.pop(wled_entry_id, ()):
+            task.cancel()
+        coordinator = self._coordinators.pop(wled_entry_id, None)
+        if coordinator is None:
+            return False
+        await coordinator.async_shutdown()
+        _LOGGER.debug("%d live WLED Extended coordinators", self.live_count)
+        return True
+
+    async def async_shutdown(self) -> None:
+        """Stop and release every coordinator."""
+        self.closed = True
+        for wled_entry_id in set(self._coordinators) | set(self._tasks):
+            await self.async_remove(wled_entry_id)
+        self.scheduler.async_shutdown()
+        await self.session.close()
@@ -0,0 +1,168 @@
+"""Data models for WLED Extended."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+
+# The only info.u entry we read, e.g. ["receive mode"]
+SYNC_MODE_INFO_KEY = "UDP Sound Sync"
+
+# Maps the usermod's info strings to the select options
+SYNC_MODE_FROM_INFO = {"off": "Off", "send mode": "Send", "receive mode": "Receive"}
+
+
+# AGC presets of the usermod, by their index in the configuration
+AGC_PRESETS = ["Off", "Normal", "Vivid", "Lazy"]
+
+
+class WledAudioSnapshot:
+    """The few fields our entities read from a WLED state/info document.
+
+    Built once per response, so entities read plain attributes instead of
+    walking the decoded JSON, and two snapshots compare equal when nothing
+    our entities show has changed. A field is None when the document did not
+    carry it.
+    """
+
+    __slots__ = ("ar_enabled", "sync_mode", "version", "mac")
+
+    def __init__(
+        self,
+        ar_enabled: bool | None = None,
+        sync_mode: str | None = None,
+        version: str | None = None,
+        mac: str | None = None,
+    ) -> None:
+        """Initialize the snapshot."""
+        self.ar_enabled = ar_enabled
+        self.sync_mode = sync_mode
+        self.version = version
+        self.mac = mac
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> WledAudioSnapshot:
+        """Reduce a {"state": ..., "info": ...} document to a snapshot."""
+        state = json_data.get("state")
+        info = json_data.get("info")
+        if not isinstance(state, dict):
+            state = {}
+        if not isinstance(info, dict):
+            info = {}
+
+        ar_enabled = None
+        audio_reactive = state.get("AudioReactive")
+        if isinstance(audio_reactive, dict) and "on" in audio_reactive:
+            ar_enabled = bool(audio_reactive["on"])
+
+        sync_mode = None
+        usermods = info.get("u")
+        if isinstance(usermods, dict) and SYNC_MODE_INFO_KEY in usermods:
+            try:
+                raw_mode = str(usermods[SYNC_MODE_INFO_KEY][0]).lower()
+            except (IndexError, KeyError, TypeError):
+                raw_mode = ""
+            sync_mode = SYNC_MODE_FROM_INFO.get(raw_mode, "Unknown")
+
+        return cls(ar_enabled, sync_mode, info.get("ver"), info.get("mac"))
+
+    def merged(self, other: WledAudioSnapshot) -> WledAudioSnapshot:
+        """Return a copy with every field other carries replacing ours."""
+        return WledAudioSnapshot(
+            *(
+                getattr(self, name) if getattr(other, name) is None else getattr(other, name)
+                for name in self.__slots__
+            )
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare field by field."""
+        if not isinstance(other, WledAudioSnapshot):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return a readable representation."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"WledAudioSnapshot({fields})"
+
+
+class WledAudioConfig:
+    """The Audio Reactive settings our entities read from /json/cfg.
+
+    These only change when someone edits the configuration, so they are kept
+    apart from the frequently polled WledAudioSnapshot. A field is None when
+    the device does not have the usermod or did not report the setting.
+    """
+
+    __slots__ = ("gain", "squelch", "agc", "sync_port")
+
+    def __init__(
+        self,
+        gain: int | None = None,
+        squelch: int | None = None,
+        agc: int | None = None,
+        sync_port: int | None = None,
+    ) -> None:
+        """Initialize the configuration."""
+        self.gain = gain
+        self.squelch = squelch
+        self.agc = agc
+        self.sync_port = sync_port
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> WledAudioConfig:
+        """Reduce a /json/cfg document to the Audio Reactive settings."""
+        usermods = json_data.get("um")
+        usermod = usermods.get("AudioReactive") if isinstance(usermods, dict) else None
+        if not isinstance(usermod, dict):
+            return cls()
+        config = usermod.get("config")
+        sync = usermod.get("sync")
+        if not isinstance(config, dict):
+            config = {}
+        if not isinstance(sync, dict):
+            sync = {}
+        return cls(config.get("gain"), config.get("squelch"), config.get("AGC"), sync.get("port"))
+
+    def __eq__(self, other: object) -> bool:
+        """Compare field by field."""
+        if not isinstance(other, WledAudioConfig):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return a readable representation."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"WledAudioConfig({fields})"
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """What a device's firmware offers, as found by capability detection.
+
+    Remembered across restarts for each firmware version, so detection only
+    runs again after a firmware update. detected_at is the wall-clock time
+    of the detection.
+    """
+
+    version: str | None
+    uses_si: bool
+    audio_reactive: bool
+    detected_at: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DeviceCapabilities:
+        """Create capabilities from stored data."""
+        return cls(
+            data.get("version"),
+            bool(data.get("uses_si")),
+            bool(data.get("audio_reactive")),
+            float(data.get("detected_at") or 0.0),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the capabilities for storage."""
+        return asdict(self)
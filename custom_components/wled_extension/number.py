@@ -0,0 +1,111 @@
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import EntityCategory
+
+from .api import WledApiError
+from .coordinator import WledConfigCoordinator
+from .entity import WledConfigEntity, async_setup_device_entities
+from .models import WledAudioConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class WledConfigNumberEntityDescription(NumberEntityDescription):
+    """Describes an Audio Reactive configuration number."""
+
+    value_fn: Callable[[WledAudioConfig], int | None]
+    changes_fn: Callable[[int], dict]
+
+
+CONFIG_NUMBERS: tuple[WledConfigNumberEntityDescription, ...] = (
+    WledConfigNumberEntityDescription(
+        key="audio_gain",
+        name="Audio gain",
+        icon="mdi:amplifier",
+        native_min_value=1,
+        native_max_value=255,
+        native_step=1,
+        value_fn=lambda config: config.gain,
+        changes_fn=lambda value: {"config": {"gain": value}},
+    ),
+    WledConfigNumberEntityDescription(
+        key="audio_squelch",
+        name="Audio squelch",
+        icon="mdi:volume-off",
+        native_min_value=0,
+        native_max_value=255,
+        native_step=1,
+        value_fn=lambda config: config.squelch,
+        changes_fn=lambda value: {"config": {"squelch": value}},
+    ),
+    WledConfigNumberEntityDescription(
+        key="audio_sync_port",
+        name="Audio sync port",
+        icon="mdi:ethernet",
+        native_min_value=1024,
+        native_max_value=65535,
+        native_step=1,
+        mode=NumberMode.BOX,
+        value_fn=lambda config: config.sync_port,
+        changes_fn=lambda value: {"sync": {"port": value}},
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the number entities."""
+    async_setup_device_entities(
+        hass,
+        entry,
+        async_add_entities,
+        lambda coordinator: [
+            WledConfigNumber(coordinator.config, description) for description in CONFIG_NUMBERS
+        ],
+    )
+
+
+class WledConfigNumber(WledConfigEntity, NumberEntity):
+    """An Audio Reactive setting from the device configuration."""
+
+    entity_description: WledConfigNumberEntityDescription
+    _attr_entity_category = EntityCategory.CONFIG
+
+    def __init__(
+        self,
+        coordinator: WledConfigCoordinator,
+        description: WledConfigNumberEntityDescription,
+    ):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.device.host}_{description.key}"
+
+    @property
+    def available(self) -> bool:
+        """Return True if the device reported this setting."""
+        return super().available and self.native_value is not None
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the configured value."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Write the setting to the device configuration."""
+        try:
+            await self.coordinator.async_set_config(self.entity_description.changes_fn(int(value)))
+        except WledApiError as err:
+            _LOGGER.error("Error setting %s: %s", self.entity_description.name, err)
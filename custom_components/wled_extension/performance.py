@@ -0,0 +1,111 @@
+"""Rolling device performance figures taken from the WLED info document."""
+from collections import deque
+from collections.abc import Callable
+
+from .const import (
+    PERFORMANCE_FPS_LOW,
+    PERFORMANCE_HEAP_LOW,
+    PERFORMANCE_RSSI_LOW,
+    PERFORMANCE_WINDOW,
+)
+
+
+class RollingWindow:
+    """The last few values of a figure in a fixed-size buffer."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, size: int = PERFORMANCE_WINDOW) -> None:
+        """Initialize an empty window."""
+        self._values: deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        """Add a value, dropping the oldest one if the window is full."""
+        self._values.append(value)
+
+    @property
+    def latest(self) -> float | None:
+        """Return the newest value."""
+        return self._values[-1] if self._values else None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest value in the window."""
+        return min(self._values) if self._values else None
+
+    @property
+    def average(self) -> float | None:
+        """Return the mean of the window."""
+        return sum(self._values) / len(self._values) if self._values else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest value in the window."""
+        return max(self._values) if self._values else None
+
+
+# Figure name, path in the info document, and the value it must not drop below
+_FIGURES: tuple[tuple[str, tuple[str, ...], float], ...] = (
+    ("fps", ("leds", "fps"), PERFORMANCE_FPS_LOW),
+    ("free_heap", ("freeheap",), PERFORMANCE_HEAP_LOW),
+    ("rssi", ("wifi", "rssi"), PERFORMANCE_RSSI_LOW),
+)
+
+
+def _lookup(info: dict, path: tuple[str, ...]) -> float | None:
+    """Return the number at path in the info document, if there is one."""
+    value = info
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class DevicePerformance:
+    """Rendering fps, free heap, Wi-Fi RSSI and uptime of one device.
+
+    Fed with every info document the client decodes anyway, so it costs no
+    requests. These figures change on every document and are kept out of
+    WledAudioSnapshot so they never count as a state change. Listeners are
+    only called when a figure crosses its low threshold; the sensors write
+    everything else on their own interval.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty windows."""
+        self.windows = {name: RollingWindow() for name, _, _ in _FIGURES}
+        self.uptime: int | None = None
+        self.restarts = 0
+        self._low: dict[str, bool] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    def record(self, info: dict) -> None:
+        """Add the figures of an info document."""
+        crossed = False
+        for name, path, threshold in _FIGURES:
+            value = _lookup(info, path)
+            if value is None:
+                continue
+            self.windows[name].add(value)
+            low = value < threshold
+            if self._low.get(name, low) != low:
+                crossed = True
+            self._low[name] = low
+
+        uptime = _lookup(info, ("uptime",))
+        if uptime is not None:
+            if self.uptime is not None and uptime < self.uptime:
+                # Uptime went backwards: the device rebooted (e.g. out of heap)
+                self.restarts += 1
+                crossed = True
+            self.uptime = int(uptime)
+
+        if crossed:
+            for listener in list(self._listeners):
+                listener()
+
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener on threshold crossings. Returns a callback that removes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
@@ -0,0 +1,224 @@
+"""Latency-aware planning of the Audio Reactive sync topology."""
+import asyncio
+import logging
+import statistics
+from dataclasses import dataclass
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import WledApiError
+from .coordinator import WledExtendedDataCoordinator
+from .manager import WledCoordinatorManager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class HostSample:
+    """Round trips measured to one device."""
+
+    coordinator: WledExtendedDataCoordinator
+    latencies: list[float]
+    attempts: int
+
+    @property
+    def loss(self) -> float:
+        """Return the fraction of pings that failed."""
+        return 1 - len(self.latencies) / self.attempts if self.attempts else 1.0
+
+    @property
+    def latency(self) -> float | None:
+        """Return the median round trip in seconds."""
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def as_dict(self) -> dict:
+        """Return the sample for a service response."""
+        latency = self.latency
+        return {
+            "host": self.coordinator.host,
+            "latency_ms": None if latency is None else round(latency * 1000, 1),
+            "loss": round(self.loss, 3),
+        }
+
+
+class WledSyncPlanner:
+    """Picks the Send master with the best network path and applies the plan.
+
+    Devices are pinged together for a number of rounds and ranked by loss,
+    then median latency. An applied plan is followed: once its master fails
+    to update, the same plan is made again among the remaining devices, and
+    the lost master is made to receive as soon as it updates again.
+    """
+
+    def __init__(self, hass: HomeAssistant, manager: WledCoordinatorManager):
+        """Initialize the planner."""
+        self.hass = hass
+        self._manager = manager
+        self.master: str | None = None
+        self._plan: tuple[list[str], int, float, float] | None = None
+        self._unsub_master: CALLBACK_TYPE | None = None
+        self._replan_task: asyncio.Task | None = None
+        # Lost masters waiting to come back, so they can be made to receive
+        self._unsub_demote: dict[str, CALLBACK_TYPE] = {}
+
+    async def async_sample(
+        self,
+        coordinators: list[WledExtendedDataCoordinator],
+        samples: int,
+        interval: float,
+        timeout: float,
+    ) -> list[HostSample]:
+        """Ping every device samples times and return them, best first."""
+        results = {c.host: HostSample(c, [], 0) for c in coordinators}
+
+        async def _async_ping(coordinator: WledExtendedDataCoordinator) -> None:
+            sample = results[coordinator.host]
+            sample.attempts += 1
+            try:
+                async with asyncio.timeout(timeout):
+                    sample.latencies.append(await coordinator.api_client.async_ping())
+            except (TimeoutError, WledApiError) as err:
+                _LOGGER.debug("Ping of %s failed: %s", coordinator.host, err)
+
+        for round_number in range(samples):
+            if round_number:
+                await asyncio.sleep(interval)
+            await asyncio.gather(*(_async_ping(c) for c in coordinators))
+
+        return sorted(
+            results.values(),
+            key=lambda sample: (sample.loss, sample.latency if sample.latency is not None else float("inf")),
+        )
+
+    async def async_plan(
+        self,
+        coordinators: list[WledExtendedDataCoordinator],
+        samples: int,
+        interval: float,
+        timeout: float,
+        apply: bool,
+    ) -> dict:
+        """Rank the devices and optionally make the best one the only sender."""
+        return await self._async_plan(
+            coordinators, [c.host for c in coordinators], samples, interval, timeout, apply
+        )
+
+    async def _async_plan(
+        self,
+        coordinators: list[WledExtendedDataCoordinator],
+        hosts: list[str],
+        samples: int,
+        interval: float,
+        timeout: float,
+        apply: bool,
+    ) -> dict:
+        """Plan among coordinators; an applied plan is followed over hosts."""
+        ranking = await self.async_sample(coordinators, samples, interval, timeout)
+        reachable = [sample for sample in ranking if sample.latencies]
+        master = reachable[0].coordinator if reachable else None
+        response = {
+            "ranking": [sample.as_dict() for sample in ranking],
+            "master": master.host if master else None,
+            "devices": {},
+        }
+        if not apply or master is None:
+            return response
+
+        async def _async_send(coordinator: WledExtendedDataCoordinator) -> None:
+            await coordinator.commands.async_set_sync_mode("Send" if coordinator is master else "Receive")
+            coordinator.async_boost()
+
+        _LOGGER.info("Making %s the audio sync master of %d devices", master.host, len(coordinators))
+        response["devices"] = await self._manager.async_run_on_devices(coordinators, _async_send, timeout)
+        self._async_follow(master, hosts, samples, interval, timeout)
+        return response
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the applied plan."""
+        if self._unsub_master:
+            self._unsub_master()
+            self._unsub_master = None
+        if self._replan_task and not self._replan_task.done():
+            self._replan_task.cancel()
+        for unsub in self._unsub_demote.values():
+            unsub()
+        self._unsub_demote.clear()
+        self._plan = None
+        self.master = None
+
+    @callback
+    def _async_follow(
+        self,
+        master: WledExtendedDataCoordinator,
+        hosts: list[str],
+        samples: int,
+        interval: float,
+        timeout: float,
+    ) -> None:
+        """Watch the master of an applied plan."""
+        if self._unsub_master:
+            self._unsub_master()
+        self.master = master.host
+        self._plan = (hosts, samples, interval, timeout)
+        if unsub_demote := self._unsub_demote.pop(master.host, None):
+            # A former master that is chosen again must keep sending
+            unsub_demote()
+
+        @callback
+        def _async_master_updated() -> None:
+            if master.last_update_success or (self._replan_task and not self._replan_task.done()):
+                return
+            _LOGGER.warning("Audio sync master %s is unavailable, choosing a new one", master.host)
+            self._replan_task = self.hass.async_create_background_task(
+                self._async_replan(master.host), name="wled_extension audio sync replan"
+            )
+
+        self._unsub_master = master.async_add_listener(_async_master_updated)
+
+    async def _async_replan(self, lost_master: str) -> None:
+        """Apply the followed plan again without the lost master.
+
+        The lost master stays in the plan, so it can be chosen again later.
+        """
+        hosts, samples, interval, timeout = self._plan
+        coordinators = [
+            coordinator
+            for coordinator in self._manager.coordinators.values()
+            if coordinator.host in hosts and coordinator.host != lost_master
+        ]
+        if not coordinators:
+            self.async_stop()
+            return
+        self._async_demote_when_back(lost_master)
+        await self._async_plan(coordinators, hosts, samples, interval, timeout, apply=True)
+
+    @callback
+    def _async_demote_when_back(self, host: str) -> None:
+        """Make a lost master receive once it updates again, so only one device sends."""
+        coordinator = next(
+            (c for c in self._manager.coordinators.values() if c.host == host), None
+        )
+        if coordinator is None or host in self._unsub_demote:
+            return
+
+        @callback
+        def _async_lost_master_updated() -> None:
+            if not coordinator.last_update_success:
+                return
+            self._unsub_demote.pop(host)()
+            _LOGGER.info("Former audio sync master %s is back, making it receive", host)
+            self.hass.async_create_background_task(
+                self._async_demote(coordinator), name="wled_extension audio sync demote"
+            )
+
+        self._unsub_demote[host] = coordinator.async_add_listener(_async_lost_master_updated)
+
+    async def _async_demote(self, coordinator: WledExtendedDataCoordinator) -> None:
+        """Switch a former master to Receive."""
+        try:
+            await coordinator.commands.async_set_sync_mode("Receive")
+        except WledApiError as err:
+            _LOGGER.warning("Can't make former audio sync master %s receive: %s", coordinator.host, err)
+            return
+        coordinator.async_boost()
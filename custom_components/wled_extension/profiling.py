@@ -0,0 +1,138 @@
+"""On-demand timing of the poll and command paths of WLED Extended."""
+import asyncio
+import cProfile
+import json
+import logging
+import time
+from contextlib import nullcontext, suppress
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Returned by stage() while no profile runs, so hooks cost one function call
+_NOT_PROFILING = nullcontext()
+
+# The stage whose completions count as cycles
+CYCLE_STAGE = "update"
+
+
+class ProfileSession:
+    """Wall-clock time spent per device and stage during one profile."""
+
+    def __init__(self, cycles: int | None) -> None:
+        """Initialize an empty session."""
+        self.started = time.time()
+        self.cycles = 0
+        self.done = asyncio.Event()
+        self._max_cycles = cycles
+        # host -> stage -> [count, total seconds, max seconds]
+        self._timings: dict[str, dict[str, list[float]]] = {}
+
+    def record(self, host: str, stage_name: str, elapsed: float) -> None:
+        """Add one timed stage."""
+        timing = self._timings.setdefault(host, {}).setdefault(stage_name, [0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += elapsed
+        timing[2] = max(timing[2], elapsed)
+        if stage_name == CYCLE_STAGE:
+            self.cycles += 1
+            if self._max_cycles and self.cycles >= self._max_cycles:
+                self.done.set()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the per-device, per-stage breakdown."""
+        return {
+            "started": dt_util.utc_from_timestamp(self.started).isoformat(),
+            "duration": round(time.time() - self.started, 3),
+            "cycles": self.cycles,
+            "devices": {
+                host: {
+                    stage_name: {
+                        "count": count,
+                        "total_ms": round(total * 1000, 3),
+                        "mean_ms": round(total * 1000 / count, 3),
+                        "max_ms": round(longest * 1000, 3),
+                    }
+                    for stage_name, (count, total, longest) in stages.items()
+                }
+                for host, stages in self._timings.items()
+            },
+        }
+
+
+class _Stage:
+    """Times one stage into the session that was running when it started."""
+
+    __slots__ = ("_session", "_host", "_name", "_started")
+
+    def __init__(self, session: ProfileSession, host: str, name: str) -> None:
+        """Initialize the stage."""
+        self._session = session
+        self._host = host
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        """Start the clock."""
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Record the elapsed time, failed stages included."""
+        self._session.record(self._host, self._name, time.perf_counter() - self._started)
+
+
+_session: ProfileSession | None = None
+
+
+def stage(host: str, name: str) -> _Stage | nullcontext:
+    """Return a context manager timing a stage of a device while profiling."""
+    if _session is None:
+        return _NOT_PROFILING
+    return _Stage(_session, host, name)
+
+
+async def async_profile(
+    hass: HomeAssistant, duration: float, cycles: int | None, with_cprofile: bool
+) -> dict[str, Any]:
+    """Time every stage for duration seconds or cycles polls, whichever ends first.
+
+    Writes the breakdown, and optionally a cProfile dump of the event loop
+    thread, to the config directory and returns the file names with the
+    breakdown.
+    """
+    global _session
+    if _session is not None:
+        raise HomeAssistantError("A WLED Extended profile is already running")
+
+    session = ProfileSession(cycles)
+    profiler = cProfile.Profile() if with_cprofile else None
+    _session = session
+    if profiler:
+        profiler.enable()
+    try:
+        with suppress(TimeoutError):
+            async with asyncio.timeout(duration):
+                await session.done.wait()
+    finally:
+        if profiler:
+            profiler.disable()
+        _session = None
+
+    report = session.as_dict()
+    stamp = dt_util.utc_from_timestamp(session.started).strftime("%Y%m%dT%H%M%S")
+    report_path = hass.config.path(f"wled_extension_profile_{stamp}.json")
+    cprofile_path = hass.config.path(f"wled_extension_profile_{stamp}.cprof") if profiler else None
+
+    def _write_files() -> None:
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        if profiler:
+            profiler.dump_stats(cprofile_path)
+
+    await hass.async_add_executor_job(_write_files)
+    _LOGGER.info("Wrote WLED Extended profile of %d cycles to %s", session.cycles, report_path)
+    return {"report": report_path, "cprofile": cprofile_path, **report}
@@ -0,0 +1,194 @@
+"""Fleet-wide poll scheduler for WLED Extended."""
+import asyncio
+import logging
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TypeVar
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import INFO_REFRESH_POLLS
+from .coordinator import WledExtendedDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def parse_interval_overrides(text: str) -> dict[str, float]:
+    """Parse 'host=seconds' pairs separated by commas or new lines.
+
+    Raises ValueError on malformed input so the options flow can reject it.
+    """
+    overrides = {}
+    for item in text.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, seconds = item.partition("=")
+        if not sep or not host.strip():
+            raise ValueError(f"Expected host=seconds, got '{item}'")
+        value = float(seconds)
+        if value <= 0:
+            raise ValueError(f"Interval for {host.strip()} must be positive")
+        overrides[host.strip()] = value
+    return overrides
+
+
+@dataclass
+class _PollSlot:
+    """Polling state of one device."""
+
+    coordinator: WledExtendedDataCoordinator
+    interval: float
+    due: float = 0.0
+    # Polls skipped in a row because the device is pushed to us
+    skipped: int = 0
+    removed: bool = False
+    unsub: CALLBACK_TYPE | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the next scheduled poll."""
+        if self.unsub:
+            self.unsub()
+            self.unsub = None
+
+
+class WledPollScheduler:
+    """Owns the polls of every device.
+
+    Polls are spread evenly across each device's interval instead of firing in
+    one burst, and at most max_concurrent requests are in flight at a time.
+    Devices whose coordinator does not need polling (WebSocket connected or
+    piggybacked on the core integration) keep their slot but are skipped,
+    except for every INFO_REFRESH_POLLS-th poll, which fetches info: WLED
+    only pushes state changes, not usermod settings such as the sync mode.
+    The delay to the next poll comes from the device's DeviceHealth, so
+    failing devices back off and offline ones only get probed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        interval: float,
+        max_concurrent: int,
+        overrides: dict[str, float] | None = None,
+    ):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._interval = interval
+        self._overrides = overrides or {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._slots: dict[str, _PollSlot] = {}
+        self._rephase_pending = False
+
+    async def async_limited(self, target: Awaitable[_T]) -> _T:
+        """Await target while holding one of the in-flight request slots."""
+        async with self._semaphore:
+            return await target
+
+    @callback
+    def async_register(self, key: str, coordinator: WledExtendedDataCoordinator) -> CALLBACK_TYPE:
+        """Start polling a device and return a callback that stops it."""
+        self.async_unregister(key)
+        interval = self._overrides.get(coordinator.host, self._interval)
+        self._slots[key] = _PollSlot(coordinator, interval)
+        self._async_schedule_rephase()
+        return partial(self.async_unregister, key)
+
+    @callback
+    def async_unregister(self, key: str) -> None:
+        """Stop polling a device."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        slot.removed = True
+        slot.async_cancel()
+        if slot.task and not slot.task.done():
+            slot.task.cancel()
+        self._async_schedule_rephase()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop polling every device."""
+        for key in list(self._slots):
+            self.async_unregister(key)
+
+    @callback
+    def _async_schedule_rephase(self) -> None:
+        """Re-spread the phases once per event-loop turn, however many devices changed."""
+        if self._rephase_pending:
+            return
+        self._rephase_pending = True
+        self.hass.loop.call_soon(self._async_rephase)
+
+    @callback
+    def _async_rephase(self) -> None:
+        """Give every device an evenly spaced offset within its interval.
+
+        A failing device keeps its backed-off due time if that is later, so
+        adding or removing a device does not bring it back to full cadence.
+        """
+        self._rephase_pending = False
+        count = len(self._slots)
+        now = self.hass.loop.time()
+        for index, slot in enumerate(self._slots.values(), start=1):
+            due = now + slot.interval * index / count
+            if slot.coordinator.health.failures:
+                due = max(due, slot.due)
+            slot.due = due
+            self._async_book(slot)
+        _LOGGER.debug("Polling %d WLED devices, staggered across their intervals", count)
+
+    @callback
+    def _async_book(self, slot: _PollSlot) -> None:
+        """Schedule the next poll of a slot at its due time."""
+        slot.async_cancel()
+        slot.unsub = async_call_later(
+            self.hass, max(0.0, slot.due - self.hass.loop.time()), partial(self._async_fire, slot)
+        )
+
+    @callback
+    def _async_advance(self, slot: _PollSlot) -> None:
+        """Book the following poll, keeping the phase while the device is healthy."""
+        if slot.removed:
+            return
+        slot.due = max(
+            slot.due + slot.coordinator.health.next_interval(slot.interval),
+            self.hass.loop.time(),
+        )
+        self._async_book(slot)
+
+    @callback
+    def _async_fire(self, slot: _PollSlot, _now) -> None:
+        """Poll or probe a device, or skip it if it is pushed to us."""
+        slot.unsub = None
+        if slot.task and not slot.task.done():
+            # Re-phased while the previous poll is still waiting or running
+            return
+        if not slot.coordinator.should_poll:
+            slot.skipped += 1
+            if slot.skipped < INFO_REFRESH_POLLS:
+                self._async_advance(slot)
+                return
+            slot.coordinator.api_client.request_info()
+        slot.skipped = 0
+        slot.task = self.hass.async_create_background_task(
+            self._async_poll(slot), name=f"wled_extension poll {slot.coordinator.host}"
+        )
+
+    async def _async_poll(self, slot: _PollSlot) -> None:
+        """Refresh a device once an in-flight slot is free."""
+        coordinator = slot.coordinator
+        try:
+            async with self._semaphore:
+                if coordinator.health.circuit_open:
+                    await coordinator.async_probe()
+                else:
+                    await coordinator.async_refresh()
+        finally:
+            self._async_advance(slot)
@@ -0,0 +1,334 @@
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .audio_sync import WledAudioSyncMonitor
+from .const import (
+    CONF_PERFORMANCE_INTERVAL,
+    DEFAULT_PERFORMANCE_INTERVAL,
+    DOMAIN,
+    SIGNAL_PERFORMANCE,
+)
+from .coordinator import WledExtendedDataCoordinator
+from .entity import WledAudioSyncEntity, WledExtendedEntity, async_setup_device_entities
+from .performance import DevicePerformance, RollingWindow
+from .stats import RequestStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Request statistics change on every poll, even when the device state does not,
+# so these sensors are written on their own slow schedule
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class WledRequestSensorEntityDescription(SensorEntityDescription):
+    """Describes a request statistics sensor."""
+
+    value_fn: Callable[[RequestStats], float | int | None]
+
+
+REQUEST_SENSORS: tuple[WledRequestSensorEntityDescription, ...] = (
+    WledRequestSensorEntityDescription(
+        key="request_latency",
+        name="Request latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _milliseconds(stats.average_latency),
+    ),
+    WledRequestSensorEntityDescription(
+        key="request_latency_p95",
+        name="Request latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _milliseconds(stats.latency_percentile(95)),
+    ),
+    WledRequestSensorEntityDescription(
+        key="polls",
+        name="Polls",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.polls,
+    ),
+    WledRequestSensorEntityDescription(
+        key="request_errors",
+        name="Request errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.error_count,
+    ),
+    WledRequestSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.bytes_received,
+    ),
+)
+
+
+def _rounded(value: float | None) -> float | None:
+    """Round a figure for display."""
+    return None if value is None else round(value, 1)
+
+
+def _window_attributes(window: RollingWindow) -> dict[str, float | None]:
+    """Return the range of a rolling window."""
+    return {"minimum": _rounded(window.minimum), "maximum": _rounded(window.maximum)}
+
+
+@dataclass(frozen=True, kw_only=True)
+class WledPerformanceSensorEntityDescription(SensorEntityDescription):
+    """Describes a device performance sensor."""
+
+    value_fn: Callable[[DevicePerformance], float | int | None]
+    attributes_fn: Callable[[DevicePerformance], dict[str, Any]]
+
+
+PERFORMANCE_SENSORS: tuple[WledPerformanceSensorEntityDescription, ...] = (
+    WledPerformanceSensorEntityDescription(
+        key="fps",
+        name="Frame rate",
+        icon="mdi:speedometer",
+        native_unit_of_measurement="fps",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda performance: _rounded(performance.windows["fps"].average),
+        attributes_fn=lambda performance: _window_attributes(performance.windows["fps"]),
+    ),
+    WledPerformanceSensorEntityDescription(
+        key="free_heap",
+        name="Free heap",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda performance: _rounded(performance.windows["free_heap"].average),
+        attributes_fn=lambda performance: _window_attributes(performance.windows["free_heap"]),
+    ),
+    WledPerformanceSensorEntityDescription(
+        key="wifi_rssi",
+        name="Wi-Fi RSSI",
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda performance: _rounded(performance.windows["rssi"].average),
+        attributes_fn=lambda performance: _window_attributes(performance.windows["rssi"]),
+    ),
+    WledPerformanceSensorEntityDescription(
+        key="uptime",
+        name="Uptime",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda performance: performance.uptime,
+        attributes_fn=lambda performance: {"restarts": performance.restarts},
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class WledAudioSyncSensorEntityDescription(SensorEntityDescription):
+    """Describes an audio sync statistics sensor."""
+
+    value_fn: Callable[[dict], Any]
+
+
+AUDIO_SYNC_SENSORS: tuple[WledAudioSyncSensorEntityDescription, ...] = (
+    WledAudioSyncSensorEntityDescription(
+        key="audio_sync_packet_rate",
+        name="Audio sync packet rate",
+        icon="mdi:waveform",
+        native_unit_of_measurement="packets/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: (
+            None if stats["packets_per_second"] is None else round(stats["packets_per_second"], 1)
+        ),
+    ),
+    WledAudioSyncSensorEntityDescription(
+        key="audio_sync_gap_p95",
+        name="Audio sync gap p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _milliseconds(stats["gap_p95"]),
+    ),
+    WledAudioSyncSensorEntityDescription(
+        key="audio_sync_last_seen",
+        name="Audio sync last seen",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda stats: (
+            None if stats["last_seen"] is None else dt_util.utc_from_timestamp(stats["last_seen"])
+        ),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic and audio sync sensor entities."""
+    monitor: WledAudioSyncMonitor | None = hass.data[DOMAIN].get("audio_sync")
+
+    @callback
+    def async_signal_performance(_now) -> None:
+        """Let every performance sensor write its state."""
+        async_dispatcher_send(hass, SIGNAL_PERFORMANCE)
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            async_signal_performance,
+            timedelta(
+                seconds=entry.options.get(CONF_PERFORMANCE_INTERVAL, DEFAULT_PERFORMANCE_INTERVAL)
+            ),
+        )
+    )
+
+    def entity_factory(coordinator: WledExtendedDataCoordinator) -> list[SensorEntity]:
+        """Create the sensors of one device."""
+        entities: list[SensorEntity] = [
+            WledRequestSensor(coordinator, description) for description in REQUEST_SENSORS
+        ]
+        entities.extend(
+            WledPerformanceSensor(coordinator, description) for description in PERFORMANCE_SENSORS
+        )
+        if monitor is not None:
+            entities.extend(
+                WledAudioSyncSensor(coordinator, monitor, description)
+                for description in AUDIO_SYNC_SENSORS
+            )
+        return entities
+
+    async_setup_device_entities(hass, entry, async_add_entities, entity_factory)
+
+
+class WledRequestSensor(WledExtendedEntity, SensorEntity):
+    """Diagnostic sensor exposing the request statistics of one device."""
+
+    entity_description: WledRequestSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        coordinator: WledExtendedDataCoordinator,
+        description: WledRequestSensorEntityDescription,
+    ):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}_{description.key}"
+
+    @property
+    def available(self) -> bool:
+        """Stay available while the device fails, when the statistics matter most."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self.coordinator.api_client.stats)
+
+    @property
+    def extra_state_attributes(self) -> None:
+        """Statistics are never restored."""
+        return None
+
+    async def async_update(self) -> None:
+        """Nothing to fetch; the statistics are read when the state is written."""
+
+
+class WledPerformanceSensor(WledExtendedEntity, SensorEntity):
+    """Diagnostic sensor with a rolling figure from the device's info.
+
+    Written on the performance interval, or right away when a figure crosses
+    its low threshold, rather than on every info document.
+    """
+
+    entity_description: WledPerformanceSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: WledExtendedDataCoordinator,
+        description: WledPerformanceSensorEntityDescription,
+    ):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state on the interval and on threshold crossings."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_PERFORMANCE, self.async_write_ha_state)
+        )
+        self.async_on_remove(
+            self.coordinator.api_client.performance.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value of the figure."""
+        return self.entity_description.value_fn(self.coordinator.api_client.performance)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the range of the figure."""
+        return self.entity_description.attributes_fn(self.coordinator.api_client.performance)
+
+
+class WledAudioSyncSensor(WledAudioSyncEntity, SensorEntity):
+    """Sensor exposing the audio sync packets one device sends."""
+
+    entity_description: WledAudioSyncSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: WledExtendedDataCoordinator,
+        monitor: WledAudioSyncMonitor,
+        description: WledAudioSyncSensorEntityDescription,
+    ):
+        """Initialize the entity."""
+        super().__init__(coordinator, monitor)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}_{description.key}"
+
+    @property
+    def native_value(self) -> Any:
+        """Return the last published value."""
+        stats = self.audio_sync_stats
+        return None if stats is None else self.entity_description.value_fn(stats)
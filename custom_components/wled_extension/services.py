@@ -0,0 +1,241 @@
+"""Services for WLED Extended."""
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    ATTR_FLOOR_ID,
+    ATTR_LABEL_ID,
+    ENTITY_MATCH_ALL,
+    ENTITY_MATCH_NONE,
+)
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from .api import MODE_TO_WLED_API
+from .const import DOMAIN
+from .coordinator import WledExtendedDataCoordinator
+from .profiling import async_profile
+from .planner import WledSyncPlanner
+
+_LOGGER = logging.getLogger(__name__)
+
+# Call data keys that make up a service target
+TARGET_KEYS = (ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID, ATTR_FLOOR_ID, ATTR_LABEL_ID)
+
+SERVICE_SET_AUDIO_SYNC = "set_audio_sync"
+SERVICE_PLAN_AUDIO_SYNC = "plan_audio_sync"
+SERVICE_PROFILE = "profile"
+
+ATTR_MODE = "mode"
+ATTR_ENABLED = "enabled"
+ATTR_TIMEOUT = "timeout"
+ATTR_SAMPLES = "samples"
+ATTR_INTERVAL = "interval"
+ATTR_APPLY = "apply"
+ATTR_DURATION = "duration"
+ATTR_CYCLES = "cycles"
+ATTR_CPROFILE = "cprofile"
+
+DEFAULT_SERVICE_TIMEOUT = 10
+DEFAULT_SAMPLES = 5
+DEFAULT_SAMPLE_INTERVAL = 0.5
+DEFAULT_PROFILE_DURATION = 60
+
+# The target is optional (no target means every device), so these are plain
+# schemas rather than entity service schemas, which require one
+SET_AUDIO_SYNC_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **cv.TARGET_SERVICE_FIELDS,
+            vol.Optional(ATTR_MODE): vol.In(list(MODE_TO_WLED_API)),
+            vol.Optional(ATTR_ENABLED): cv.boolean,
+            vol.Optional(ATTR_TIMEOUT, default=DEFAULT_SERVICE_TIMEOUT): vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=60)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_MODE, ATTR_ENABLED),
+)
+
+PLAN_AUDIO_SYNC_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_SAMPLES, default=DEFAULT_SAMPLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=50)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_SAMPLE_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=10)
+        ),
+        vol.Optional(ATTR_APPLY, default=False): cv.boolean,
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_SERVICE_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=60)
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1, max=100000)),
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+    }
+)
+
+
+def _target_ids(call: ServiceCall, key: str) -> list[str]:
+    """Return the IDs of one kind of target in a call."""
+    ids = call.data.get(key)
+    if not ids or ids == ENTITY_MATCH_NONE:
+        return []
+    return list(ids)
+
+
+@callback
+def _async_targeted_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[WledExtendedDataCoordinator]:
+    """Return the coordinators of the targeted devices, or all of them if none are targeted.
+
+    Targets are resolved to devices through the registries, then to the WLED
+    config entries of those devices. Entity extraction is not used: it leaves
+    out our configuration and diagnostic entities when expanding devices and
+    areas. A target that matches none of our devices returns an empty list,
+    never the whole fleet.
+    """
+    coordinators = hass.data[DOMAIN]["manager"].coordinators
+    if not any(key in call.data for key in TARGET_KEYS):
+        return list(coordinators.values())
+    if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        return list(coordinators.values())
+
+    dev_reg = dr.async_get(hass)
+    ent_reg = er.async_get(hass)
+    device_ids = set(_target_ids(call, ATTR_DEVICE_ID))
+    entity_ids = set(_target_ids(call, ATTR_ENTITY_ID))
+    area_ids = set(_target_ids(call, ATTR_AREA_ID))
+
+    area_reg = ar.async_get(hass)
+    for floor_id in _target_ids(call, ATTR_FLOOR_ID):
+        area_ids.update(area.id for area in ar.async_entries_for_floor(area_reg, floor_id))
+    for label_id in _target_ids(call, ATTR_LABEL_ID):
+        area_ids.update(area.id for area in ar.async_entries_for_label(area_reg, label_id))
+        device_ids.update(device.id for device in dr.async_entries_for_label(dev_reg, label_id))
+        entity_ids.update(entity.entity_id for entity in er.async_entries_for_label(ent_reg, label_id))
+    for area_id in area_ids:
+        device_ids.update(device.id for device in dr.async_entries_for_area(dev_reg, area_id))
+        entity_ids.update(entity.entity_id for entity in er.async_entries_for_area(ent_reg, area_id))
+    for entity_id in entity_ids:
+        if (entity := ent_reg.async_get(entity_id)) and entity.device_id:
+            device_ids.add(entity.device_id)
+
+    # Coordinators are keyed by the WLED config entry of their device
+    entry_ids = set()
+    for device_id in device_ids:
+        if device := dev_reg.async_get(device_id):
+            entry_ids.update(device.config_entries)
+    return [
+        coordinator
+        for wled_entry_id, coordinator in coordinators.items()
+        if wled_entry_id in entry_ids
+    ]
+
+
+async def _async_set_audio_sync(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Apply Audio Reactive settings to many devices at once."""
+    manager = hass.data[DOMAIN]["manager"]
+    mode = call.data.get(ATTR_MODE)
+    enabled = call.data.get(ATTR_ENABLED)
+    timeout = call.data[ATTR_TIMEOUT]
+
+    async def _async_send(coordinator: WledExtendedDataCoordinator) -> None:
+        # Issued together, both commands land in the same per-device batch
+        commands = []
+        if enabled is not None:
+            commands.append(coordinator.commands.async_set_audio_reactive(enabled))
+        if mode is not None:
+            commands.append(coordinator.commands.async_set_sync_mode(mode))
+        await asyncio.gather(*commands)
+        coordinator.async_boost()
+
+    coordinators = _async_targeted_coordinators(hass, call)
+    _LOGGER.debug("Applying Audio Reactive settings to %d devices", len(coordinators))
+    return {"devices": await manager.async_run_on_devices(coordinators, _async_send, timeout)}
+
+
+async def _async_plan_audio_sync(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Rank devices by network path and optionally make the best one the sender."""
+    planner: WledSyncPlanner = hass.data[DOMAIN]["planner"]
+    coordinators = _async_targeted_coordinators(hass, call)
+    if not coordinators and call.data[ATTR_APPLY]:
+        raise ServiceValidationError("The target does not match any WLED device to plan for")
+    _LOGGER.debug("Planning the audio sync topology of %d devices", len(coordinators))
+    return await planner.async_plan(
+        coordinators,
+        call.data[ATTR_SAMPLES],
+        call.data[ATTR_INTERVAL],
+        call.data[ATTR_TIMEOUT],
+        call.data[ATTR_APPLY],
+    )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_set_audio_sync(call: ServiceCall) -> ServiceResponse:
+        return await _async_set_audio_sync(hass, call)
+
+    async def async_plan_audio_sync(call: ServiceCall) -> ServiceResponse:
+        return await _async_plan_audio_sync(hass, call)
+
+    async def async_run_profile(call: ServiceCall) -> ServiceResponse:
+        return await async_profile(
+            hass, call.data[ATTR_DURATION], call.data.get(ATTR_CYCLES), call.data[ATTR_CPROFILE]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_AUDIO_SYNC,
+        async_set_audio_sync,
+        schema=SET_AUDIO_SYNC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_AUDIO_SYNC,
+        async_plan_audio_sync,
+        schema=PLAN_AUDIO_SYNC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_run_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the integration's services."""
+    hass.services.async_remove(DOMAIN, SERVICE_SET_AUDIO_SYNC)
+    hass.services.async_remove(DOMAIN, SERVICE_PLAN_AUDIO_SYNC)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
@@ -0,0 +1,93 @@
+"""Request instrumentation for WLED Extended."""
+from bisect import bisect_left
+from collections import Counter
+from typing import Any
+
+# Upper bounds (seconds) of the latency histogram buckets; one more bucket
+# counts everything slower than the last bound
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Counters and a latency histogram for the requests sent to one device."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.requests = 0
+        self.polls = 0
+        self.bytes_received = 0
+        self.latency_total = 0.0
+        self.decodes = 0
+        self.decode_total = 0.0
+        self.unchanged = 0
+        self.timeouts = 0
+        self.errors: Counter[str] = Counter()
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    @property
+    def error_count(self) -> int:
+        """Return the number of failed requests, timeouts included."""
+        return sum(self.errors.values())
+
+    @property
+    def average_latency(self) -> float | None:
+        """Return the mean request latency in seconds."""
+        if not self.requests:
+            return None
+        return self.latency_total / self.requests
+
+    @property
+    def average_decode_time(self) -> float | None:
+        """Return the mean JSON decode time in seconds."""
+        if not self.decodes:
+            return None
+        return self.decode_total / self.decodes
+
+    def record_request(self, latency: float, size: int = 0) -> None:
+        """Record a successful request."""
+        self.requests += 1
+        self.bytes_received += size
+        self.latency_total += latency
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_decode(self, decode_time: float) -> None:
+        """Record the time spent decoding one JSON body."""
+        self.decodes += 1
+        self.decode_total += decode_time
+
+    def record_error(self, err: BaseException) -> None:
+        """Record a failed request by error class."""
+        if isinstance(err, TimeoutError):
+            self.timeouts += 1
+        self.errors[type(err).__name__] += 1
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Return the bucket bound below which the given share of requests finished."""
+        if not self.requests:
+            return None
+        threshold = self.requests * percentile / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return None  # Slower than the last bucket
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "requests": self.requests,
+            "polls": self.polls,
+            "bytes_received": self.bytes_received,
+            "average_latency": self.average_latency,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "average_decode_time": self.average_decode_time,
+            "unchanged_responses": self.unchanged,
+            "timeouts": self.timeouts,
+            "errors": dict(self.errors),
+            "latency_histogram": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram)},
+                "slower": self.latency_histogram[-1],
+            },
+        }
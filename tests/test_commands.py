@@ -0,0 +1,124 @@
+"""Tests of the per-device command queue."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.wled_extension.api import WledApiError  # noqa: E402
+from custom_components.wled_extension.commands import (  # noqa: E402
+    WledCommandQueue,
+    merge_state,
+)
+from custom_components.wled_extension.const import COMMAND_DEBOUNCE  # noqa: E402
+from custom_components.wled_extension.models import WledAudioSnapshot  # noqa: E402
+
+
+class FakeApi:
+    """Records the requests the queue sends."""
+
+    host = "wled.test"
+
+    def __init__(self, fail: bool = False) -> None:
+        self.states: list[dict] = []
+        self.sync_modes: list[str] = []
+        self.fail = fail
+
+    async def async_set_state(self, payload: dict) -> WledAudioSnapshot:
+        if self.fail:
+            raise WledApiError("offline")
+        self.states.append(payload)
+        enabled = payload.get("AudioReactive", {}).get("enabled", True)
+        return WledAudioSnapshot(ar_enabled=enabled)
+
+    async def async_set_sync_mode(self, mode: str) -> bool:
+        self.sync_modes.append(mode)
+        return True
+
+
+def _make_queue(api: FakeApi) -> tuple[WledCommandQueue, list, list]:
+    """Return a queue on the running loop, with what it applied and refreshed."""
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(
+        loop=loop,
+        async_create_background_task=lambda target, name: loop.create_task(target, name=name),
+    )
+    applied: list[WledAudioSnapshot] = []
+    refreshes: list[None] = []
+
+    async def _async_refresh() -> None:
+        refreshes.append(None)
+
+    return WledCommandQueue(hass, api, applied.append, _async_refresh), applied, refreshes
+
+
+def test_merge_state_is_deep_and_later_wins() -> None:
+    target = {"AudioReactive": {"enabled": False}, "on": True}
+    merge_state(target, {"AudioReactive": {"enabled": True}, "bri": 10})
+    assert target == {"AudioReactive": {"enabled": True}, "on": True, "bri": 10}
+
+
+def test_enabled_stays_on_state_when_batched_with_sync_mode() -> None:
+    async def _run() -> None:
+        api = FakeApi()
+        queue, applied, refreshes = _make_queue(api)
+        await asyncio.gather(
+            queue.async_set_audio_reactive(True), queue.async_set_sync_mode("Send")
+        )
+        assert api.states == [{"AudioReactive": {"enabled": True}}]
+        assert api.sync_modes == ["Send"]
+        assert applied[0].ar_enabled is True
+        # The sync mode is not part of any answer, so it is read back
+        assert len(refreshes) == 1
+
+    asyncio.run(_run())
+
+
+def test_enabled_alone_is_a_state_change() -> None:
+    async def _run() -> None:
+        api = FakeApi()
+        queue, _, refreshes = _make_queue(api)
+        await queue.async_set_audio_reactive(False)
+        assert api.states == [{"AudioReactive": {"enabled": False}}]
+        assert api.sync_modes == []
+        assert refreshes == []
+
+    asyncio.run(_run())
+
+
+def test_burst_is_debounced_into_one_request() -> None:
+    async def _run() -> None:
+        api = FakeApi()
+        queue, _, _ = _make_queue(api)
+        await queue.async_set_audio_reactive(True)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # Within the debounce window of the previous batch: waits, then merges
+        await asyncio.gather(
+            queue.async_set_state({"AudioReactive": {"enabled": False}}),
+            queue.async_set_state({"AudioReactive": {"enabled": True}}),
+        )
+        assert loop.time() - started >= COMMAND_DEBOUNCE * 0.9
+        assert api.states == [
+            {"AudioReactive": {"enabled": True}},
+            {"AudioReactive": {"enabled": True}},
+        ]
+
+    asyncio.run(_run())
+
+
+def test_failure_refreshes_and_reaches_every_caller() -> None:
+    async def _run() -> None:
+        api = FakeApi(fail=True)
+        queue, _, refreshes = _make_queue(api)
+        results = await asyncio.gather(
+            queue.async_set_audio_reactive(True),
+            queue.async_set_sync_mode("Receive"),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, WledApiError) for result in results)
+        assert api.sync_modes == []
+        assert len(refreshes) == 1
+
+    asyncio.run(_run())